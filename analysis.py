@@ -0,0 +1,1208 @@
+"""
+Resume scoring and analysis - ML scoring, name extraction and the hybrid
+ML + LLM analysis. Kept free of Streamlit so it can be reused outside the app.
+"""
+
+import asyncio
+import json
+import os
+import re
+import hashlib
+import itertools
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+import math
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from rapidfuzz import fuzz, process
+
+from cache import DiskCache
+from rate_limit import LLM_CALL_TIMEOUT
+from scanner import (
+    CITIES,
+    EDUCATION_LEVELS,
+    EDUCATION_NOT_DETECTED,
+    EMAIL_PATTERN,
+    EXPERIENCE_PATTERNS,
+    PHONE_PATTERNS,
+    REQUIRED_EXPERIENCE_PATTERNS,
+    scan_required_experience,
+    scan_resume,
+)
+
+# Bump when scoring changes (weights, matching, scanner patterns) so journaled results are not replayed
+SCORING_VERSION = 3
+
+
+def get_content_hash(text):
+    """Generate hash of resume content for duplicate detection"""
+    normalized = re.sub(r'\s+', ' ', text.lower().strip())
+    return hashlib.md5(normalized.encode()).hexdigest()
+
+## ===================== LLM CALLS ===================== ##
+
+LLM_MODEL = "llama-3.1-8b-instant"
+
+# Starting number of in-flight LLM requests for the async analysis engine;
+# the rate limiter adapts it from there
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "16"))
+
+# Replies are cached on disk: with temperature 0 and a fixed seed the same prompt
+# gives the same answer, so re-runs over unchanged resumes make no LLM calls
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "128"))
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    """Shared LLM response cache, or None if unavailable"""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            try:
+                _llm_cache = DiskCache(
+                    "llm_responses", "temperature=0.0;seed=42",
+                    LLM_CACHE_MAX_MB * 1024 * 1024, ttl=LLM_CACHE_TTL_HOURS * 3600
+                )
+            except (sqlite3.Error, OSError):
+                return None
+        return _llm_cache
+
+def _parse_json_reply(result_text):
+    """Strip markdown code fences from an LLM reply and parse the JSON inside"""
+    if "```json" in result_text:
+        result_text = result_text.split("```json")[1].split("```")[0]
+    elif "```" in result_text:
+        result_text = result_text.split("```")[1].split("```")[0]
+    return json.loads(result_text)
+
+def _llm_cache_key(model, max_tokens, prompt):
+    return hashlib.sha256(f"{model}\n{max_tokens}\n{prompt}".encode()).hexdigest()
+
+def _chat_request(model, prompt, max_tokens):
+    """Keyword arguments for a deterministic chat completion, abandoned after LLM_CALL_TIMEOUT seconds"""
+    return dict(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.0,
+        max_tokens=max_tokens,
+        seed=42,
+        timeout=LLM_CALL_TIMEOUT
+    )
+
+def chat_json(client, prompt, max_tokens, model=LLM_MODEL):
+    """Send a prompt at temperature 0 and parse the JSON reply.
+
+    Checked against the disk cache first, keyed by (model, max_tokens, prompt hash).
+    Only replies that parse are cached. Raises on API or parse errors.
+    """
+    cache = get_llm_cache()
+    key = _llm_cache_key(model, max_tokens, prompt)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return _parse_json_reply(cached)
+
+    response = client.chat.completions.create(**_chat_request(model, prompt, max_tokens))
+    result_text = response.choices[0].message.content.strip()
+    parsed = _parse_json_reply(result_text)
+    if cache is not None:
+        cache.set(key, result_text)
+    return parsed
+
+async def achat_json(client, prompt, max_tokens, model=LLM_MODEL, limiter=None, use_cache=True, priority=0):
+    """chat_json for an AsyncGroq client - cache reads and writes run off the event loop.
+
+    With a rate_limit.RateLimiter the request is paced, retried on 429s and
+    transient errors, and its rate-limit headers feed the limiter. Higher
+    priority requests are sent first when the limiter is saturated.
+    """
+    cache = get_llm_cache() if use_cache else None
+    key = _llm_cache_key(model, max_tokens, prompt)
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return _parse_json_reply(cached)
+
+    request = _chat_request(model, prompt, max_tokens)
+    if limiter is None:
+        response = await client.chat.completions.create(**request)
+    else:
+        # ~4 characters per token, plus the reply
+        raw = await limiter.call(
+            lambda: client.chat.completions.with_raw_response.create(**request),
+            llm_tokens=len(prompt) // 4 + max_tokens,
+            priority=priority
+        )
+        response = await raw.parse()
+    result_text = response.choices[0].message.content.strip()
+    parsed = _parse_json_reply(result_text)
+    if cache is not None:
+        await asyncio.to_thread(cache.set, key, result_text)
+    return parsed
+
+def cached_llm_reply(prompt, max_tokens, model=LLM_MODEL):
+    """Parsed cached reply for a prompt, or None"""
+    cache = get_llm_cache()
+    cached = cache.get(_llm_cache_key(model, max_tokens, prompt)) if cache is not None else None
+    return _parse_json_reply(cached) if cached is not None else None
+
+def store_llm_reply(prompt, max_tokens, reply, model=LLM_MODEL):
+    """Cache a parsed reply as if the prompt had been sent on its own"""
+    cache = get_llm_cache()
+    if cache is not None:
+        cache.set(_llm_cache_key(model, max_tokens, prompt), json.dumps(reply))
+
+def extract_keywords_from_jd(client, job_description):
+    """Extract suggested keywords from job description using AI"""
+    prompt = f"""Analyze the following job description and extract key skills, technologies, and qualifications.
+
+Return ONLY valid JSON in this exact format:
+{{
+    "job_title": "<extracted job title>",
+    "must_have_skills": ["skill1", "skill2", "skill3"],
+    "nice_to_have_skills": ["skill1", "skill2"],
+    "technologies": ["tech1", "tech2"],
+    "qualifications": ["qual1", "qual2"],
+    "experience_required": "<e.g., 3-5 years>"
+}}
+
+JOB DESCRIPTION:
+{job_description[:3000]}
+
+Return ONLY the JSON object."""
+
+    try:
+        return chat_json(client, prompt, max_tokens=800)
+    except:
+        return {"job_title": "", "must_have_skills": [], "nice_to_have_skills": [], "technologies": [], "qualifications": [], "experience_required": ""}
+
+## ===================== ML SCORING FUNCTIONS ===================== ##
+
+# These per-field extractors are the reference implementations; analyze_resume
+# uses scanner.scan_resume, which returns the same values with compiled patterns.
+# benchmark_scanner.py checks the two agree.
+
+def _contains_word(keyword, text_lower):
+    """keyword in text as a whole word, plural "s" allowed - how cities and degrees are matched"""
+    return re.search(rf"(?<![a-z0-9]){re.escape(keyword)}s?(?![a-z0-9])", text_lower) is not None
+
+def extract_contact_info(text):
+    """Extract email, phone, location using regex - NO LLM needed"""
+    # Email
+    emails = re.findall(EMAIL_PATTERN, text)
+    email = emails[0] if emails else "Not provided"
+
+    # Phone (Indian + international formats)
+    phone = "Not provided"
+    for pattern in PHONE_PATTERNS:
+        phones = re.findall(pattern, text)
+        if phones:
+            phone = phones[0].strip()
+            break
+
+    # Location - common Indian cities + international
+    location = "Not provided"
+    text_lower = text.lower()
+    for city in CITIES:
+        if _contains_word(city.lower(), text_lower):
+            location = city
+            break
+
+    return email, phone, location
+
+def extract_experience_years(text):
+    """Extract years of experience using regex - NO LLM needed"""
+    years = 0
+    for pattern in EXPERIENCE_PATTERNS:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        if matches:
+            match = matches[0]
+            if isinstance(match, tuple):
+                years = int(match[0])
+            else:
+                years = int(match)
+            break
+    return years
+
+def extract_required_experience(jd_text):
+    """Extract required years from JD"""
+    for pattern in REQUIRED_EXPERIENCE_PATTERNS:
+        matches = re.findall(pattern, jd_text, re.IGNORECASE)
+        if matches:
+            match = matches[0]
+            if isinstance(match, tuple):
+                return int(match[0])  # Take lower bound
+            return int(match)
+    return 0
+
+def extract_education(text):
+    """Detect education level from resume text - NO LLM needed"""
+    text_lower = text.lower()
+
+    # Check for degrees (highest first)
+    for level, score, keywords in EDUCATION_LEVELS:
+        for kw in keywords:
+            if _contains_word(kw, text_lower):
+                return level, score
+
+    return EDUCATION_NOT_DETECTED
+
+## ===================== SKILL DICTIONARY MATCHING ===================== ##
+
+# Common tech skills to look for
+COMMON_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust", "Ruby",
+    "React", "Angular", "Vue", "Node.js", "Express", "Django", "Flask", "FastAPI",
+    "Spring Boot", "Spring", ".NET", "Laravel", "Rails",
+    "SQL", "MySQL", "PostgreSQL", "MongoDB", "Redis", "Elasticsearch", "Cassandra",
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Jenkins", "CI/CD",
+    "Git", "GitHub", "GitLab", "Bitbucket",
+    "Machine Learning", "Deep Learning", "NLP", "Computer Vision", "AI",
+    "TensorFlow", "PyTorch", "Scikit-learn", "Pandas", "NumPy",
+    "Power BI", "Tableau", "Excel", "Data Analysis", "Data Science", "Data Engineering",
+    "REST", "API", "GraphQL", "Microservices", "SOA",
+    "Linux", "Unix", "Windows Server", "Networking",
+    "Agile", "Scrum", "JIRA", "Confluence",
+    "HTML", "CSS", "SASS", "Bootstrap", "Tailwind",
+    "Spark", "Hadoop", "Kafka", "Airflow", "ETL",
+    "Selenium", "JUnit", "pytest", "Testing", "QA",
+    "Figma", "Photoshop", "UI/UX",
+    "SAP", "Salesforce", "ServiceNow", "Oracle",
+    "Pyramid Analytics", "model monitoring", "drift detection",
+    "R", "SAS", "SPSS", "MATLAB",
+    "communication", "leadership", "problem-solving", "teamwork",
+]
+
+# Skills and text are compared as lowercase word tokens; "+" and "#" stay attached (c++, c#)
+SKILL_TOKEN_PATTERN = re.compile(r'[a-z0-9]+[+#]*')
+
+def _singular(token):
+    return token[:-1] if len(token) > 3 and token.endswith('s') else token
+
+class SkillMatcher:
+    """Finds every skill from a fixed list in a single pass over a text.
+
+    Built once per skill list and reused for the JD and every resume. The text
+    is tokenized once; one-word skills are a set lookup and multi-word skills
+    walk a trie over word tokens. Matches therefore respect word boundaries
+    ("Go" no longer matches inside "Google", "AI" inside "maintain"), separators
+    inside a name are flexible ("Node.js" / "node js", "CI/CD" / "CI-CD") and a
+    plural "s" on longer words is tolerated ("APIs" matches "API").
+    """
+
+    def __init__(self, skills):
+        self.names = {}  # lowercased skill -> first spelling given
+        self.single = {}  # one-word skills: token -> lowercased skill
+        self.trie = {}  # multi-word skills: token -> subtree, None -> lowercased skill
+        self.literal = []  # skills that must also appear verbatim (".net")
+        for skill in skills:
+            skill_lower = skill.lower().strip()
+            if not skill_lower or skill_lower in self.names:
+                continue
+            self.names[skill_lower] = skill
+            tokens = SKILL_TOKEN_PATTERN.findall(skill_lower)
+            if not tokens or not skill_lower[0].isalnum():
+                # Leading punctuation is part of the name, so check it verbatim
+                self.literal.append(skill_lower)
+            if not tokens:
+                continue
+            if len(tokens) == 1:
+                self.single.setdefault(tokens[0], []).append(skill_lower)
+            else:
+                node = self.trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[None] = skill_lower
+
+    def _child(self, node, token):
+        child = node.get(token)
+        if child is None:
+            child = node.get(_singular(token))
+        return child
+
+    def find(self, text):
+        """Return the set of lowercased skills that occur in text"""
+        text_lower = text.lower()
+        tokens = SKILL_TOKEN_PATTERN.findall(text_lower)
+        distinct = set(tokens)
+        vocabulary = distinct | {_singular(t) for t in distinct}
+
+        # One-word skills: set lookups over the distinct words
+        found = set()
+        for token in vocabulary & self.single.keys():
+            found.update(self.single[token])
+
+        # Multi-word skills: walk the trie only from words that can start one
+        starts = {t for t in distinct if self._child(self.trie, t) is not None}
+        if starts:
+            for i, token in enumerate(tokens):
+                if token not in starts:
+                    continue
+                node = self.trie
+                for next_token in tokens[i:]:
+                    node = self._child(node, next_token)
+                    if node is None:
+                        break
+                    if None in node:
+                        found.add(node[None])
+
+        for skill_lower in self.literal:
+            if skill_lower in text_lower:
+                # Punctuation-only names have no tokens to match on
+                found.add(skill_lower)
+            else:
+                found.discard(skill_lower)
+        return found
+
+    def find_skills(self, text):
+        """Skills found in text, in the order they were given to the matcher"""
+        found = self.find(text)
+        return [name for key, name in self.names.items() if key in found]
+
+COMMON_SKILL_MATCHER = SkillMatcher(COMMON_SKILLS)
+
+def extract_skills_from_jd(jd_text):
+    """Extract required skills from job description using keyword patterns"""
+    found_skills = COMMON_SKILL_MATCHER.find_skills(jd_text)
+
+    # Also extract quoted or bulleted skills
+    bullet_pattern = r'[•\-\*]\s*([A-Za-z][A-Za-z\s/\.#\+]{2,30})'
+    bullets = re.findall(bullet_pattern, jd_text)
+    for b in bullets:
+        b_clean = b.strip()
+        if b_clean and b_clean not in found_skills and len(b_clean) < 30:
+            found_skills.append(b_clean)
+
+    return sorted(set(found_skills), key=str.lower) if found_skills else ["General skills"]
+
+# Candidate skill phrases in a resume: a letter followed by 2-30 letters/spaces/skill punctuation
+RESUME_PHRASE_PATTERN = re.compile(r'[a-zA-Z][a-zA-Z\s/\.#\+]{2,30}')
+
+def build_phrase_index(resume_text):
+    """Tokenize a resume once into its unique lowercased candidate phrases"""
+    return list(dict.fromkeys(p.lower() for p in RESUME_PHRASE_PATTERN.findall(resume_text)))
+
+def match_skill_lists(skill_lists, resume_text, threshold=70, lowered_lists=None, skill_matcher=None, phrase_index=None):
+    """Match several skill lists against one resume in a single fuzzy pass.
+
+    A skill matches if it occurs as whole words in the resume (one SkillMatcher
+    pass for all lists), otherwise if any resume phrase scores >= threshold with
+    fuzz.ratio. Skills without an exact hit from every list are scored in one
+    process.cdist call. Pass lowered_lists and skill_matcher (e.g. from a
+    JDProfile) to reuse them across resumes.
+    Returns a (matched, missing) pair per input list.
+    """
+    if lowered_lists is None:
+        lowered_lists = [[s.lower() for s in skills] for skills in skill_lists]
+    if skill_matcher is None:
+        skill_matcher = SkillMatcher([s for skills in skill_lists for s in skills])
+    if phrase_index is None:
+        phrase_index = build_phrase_index(resume_text)
+
+    # Exact whole-word hits first; the rest need fuzzy scoring
+    found = skill_matcher.find(resume_text)
+    exact = []
+    fuzzy_queries = []
+    for lowered in lowered_lists:
+        hits = []
+        for skill_lower in lowered:
+            hit = skill_lower in found
+            hits.append(hit)
+            if not hit:
+                fuzzy_queries.append(skill_lower)
+        exact.append(hits)
+
+    fuzzy_hits = {}
+    if fuzzy_queries and phrase_index:
+        queries = list(dict.fromkeys(fuzzy_queries))
+        scores = process.cdist(queries, phrase_index, scorer=fuzz.ratio, score_cutoff=threshold, workers=-1)
+        best = scores.max(axis=1)
+        fuzzy_hits = {q: best[i] >= threshold for i, q in enumerate(queries)}
+
+    results = []
+    for skills, lowered, hits in zip(skill_lists, lowered_lists, exact):
+        matched = []
+        missing = []
+        for skill, skill_lower, hit in zip(skills, lowered, hits):
+            if hit or fuzzy_hits.get(skill_lower, False):
+                matched.append(skill)
+            else:
+                missing.append(skill)
+        results.append((matched, missing))
+    return results
+
+def fuzzy_match_skills(required_skills, resume_text, threshold=70):
+    """Match skills using fuzzy string matching - handles typos and variations"""
+    return match_skill_lists([required_skills], resume_text, threshold)[0]
+
+def fuzzy_match_nice_to_have(nice_to_have_skills, resume_text, threshold=70):
+    """Match nice-to-have skills using fuzzy matching"""
+    if not nice_to_have_skills:
+        return []
+    return match_skill_lists([nice_to_have_skills], resume_text, threshold)[0][0]
+
+def calculate_tfidf_similarity(resume_text, jd_text):
+    """Calculate text similarity between resume and JD using TF-IDF"""
+    try:
+        vectorizer = TfidfVectorizer(stop_words='english', max_features=5000)
+        tfidf_matrix = vectorizer.fit_transform([resume_text, jd_text])
+        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        return round(similarity * 100, 2)
+    except:
+        return 0
+
+def batch_tfidf_similarities(resume_texts, jd_text):
+    """TF-IDF similarity of every resume to the JD with one vectorizer fit on the whole batch.
+
+    IDF weights come from the full candidate pool plus the JD, so terms every
+    resume shares count for less than distinctive ones. Returns 0-100 scores in
+    input order, the same scale as calculate_tfidf_similarity.
+    """
+    return batch_tfidf_similarities_from_counts([resume_term_counts(text) for text in resume_texts], jd_text)
+
+def resume_term_counts(text):
+    """{term: count} after TF-IDF tokenization - all batch_tfidf_similarities needs of a resume"""
+    return dict(Counter(_tfidf_analyzer(text)))
+
+def _expand_term_counts(term_counts):
+    return itertools.chain.from_iterable(itertools.repeat(term, count) for term, count in term_counts.items())
+
+def batch_tfidf_similarities_from_counts(term_counts, jd_text):
+    """batch_tfidf_similarities for resumes given as resume_term_counts, e.g. stored by an earlier run"""
+    if not term_counts:
+        return []
+    try:
+        vectorizer = TfidfVectorizer(analyzer=_expand_term_counts, max_features=TFIDF_MAX_FEATURES)
+        tfidf_matrix = vectorizer.fit_transform(list(term_counts) + [resume_term_counts(jd_text)])
+    except ValueError:
+        # Empty vocabulary (e.g. only stop words)
+        return [0] * len(term_counts)
+    # Rows are L2-normalized, so one sparse matrix-vector product gives every cosine
+    similarities = (tfidf_matrix[:-1] @ tfidf_matrix[-1].T).toarray().ravel()
+    return [round(float(s) * 100, 2) for s in similarities]
+
+def calculate_verdict_from_score(score):
+    """Calculate verdict deterministically from score - NO LLM involvement"""
+    score = max(0, min(100, score))
+
+    if score >= 85:
+        return "Best Fit", "Recommend for Interview"
+    elif score >= 70:
+        return "Strong Fit", "Recommend for Interview"
+    elif score >= 50:
+        return "Average", "Consider for Interview"
+    else:
+        return "Not a Fit", "Do Not Recommend"
+
+
+## ===================== NAME EXTRACTION ===================== ##
+
+def split_camel_case(text):
+    """Split CamelCase into separate words: 'AnkitDarade' -> 'Ankit Darade'"""
+    result = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
+    result = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1 \2', result)
+    return result
+
+def clean_candidate_name(file_name):
+    """Remove platform prefixes, experience suffixes, and clean up filename for display"""
+    name = file_name
+
+    # Remove file extensions
+    for ext in ['.pdf', '.PDF', '.docx', '.DOCX', '.doc', '.DOC']:
+        name = name.replace(ext, '')
+
+    # Remove common job portal prefixes (case-insensitive)
+    platform_prefixes = [
+        r'(?i)^naukri[_\-\s]+',
+        r'(?i)^indeed[_\-\s]+',
+        r'(?i)^linkedin[_\-\s]+',
+        r'(?i)^monster[_\-\s]+',
+        r'(?i)^shine[_\-\s]+',
+        r'(?i)^timesjobs[_\-\s]+',
+        r'(?i)^glassdoor[_\-\s]+',
+        r'(?i)^foundit[_\-\s]+',
+        r'(?i)^ziprecruiter[_\-\s]+',
+        r'(?i)^hirect[_\-\s]+',
+        r'(?i)^instahyre[_\-\s]+',
+        r'(?i)^apna[_\-\s]+',
+        r'(?i)^iimjobs[_\-\s]+',
+        r'(?i)^cutshort[_\-\s]+',
+        r'(?i)^hirist[_\-\s]+',
+        r'(?i)^angellist[_\-\s]+',
+        r'(?i)^wellfound[_\-\s]+',
+    ]
+    for prefix in platform_prefixes:
+        name = re.sub(prefix, '', name)
+
+    # Remove experience tags like [6y_0m], [5y 6m], (6y_0m), [2y_3m], etc.
+    name = re.sub(r'[\[\(]\d+y[\s_\-]?\d*m?[\]\)]', '', name)
+
+    # Remove trailing numbers in brackets/parens like (1), [1], (2), [2]
+    name = re.sub(r'[\[\(]\d+[\]\)]', '', name)
+
+    # Remove date patterns like _12_01_26, _12-01-2026, _2026_01_12
+    name = re.sub(r'[_\-]?\d{1,2}[_\-]\d{1,2}[_\-]\d{2,4}', '', name)
+    name = re.sub(r'[_\-]?\d{4}[_\-]\d{1,2}[_\-]\d{1,2}', '', name)
+
+    # Replace underscores and hyphens with spaces
+    name = name.replace('_', ' ').replace('-', ' ')
+
+    # Split CamelCase: "AnkitDarade" -> "Ankit Darade"
+    name = split_camel_case(name)
+
+    # Remove "Resume", "CV", etc. AFTER underscores are replaced (so \b works correctly)
+    name = re.sub(r'(?i)\b(resume|cv|curriculum\s*vitae)\b', '', name)
+
+    # Remove extra whitespace
+    name = re.sub(r'\s+', ' ', name).strip()
+
+    # Remove any remaining lone numbers
+    name = re.sub(r'\b\d+\b', '', name).strip()
+    name = re.sub(r'\s+', ' ', name).strip()
+
+    return name if name else file_name
+
+
+def extract_name_from_resume(resume_text):
+    """Extract candidate name from resume text content.
+    Looks at the first few lines for a name pattern (2-4 capitalized words)."""
+    if not resume_text or resume_text.startswith("Error"):
+        return None
+
+    # Words that are NOT names - common resume headers/labels
+    skip_words = {
+        'resume', 'cv', 'curriculum', 'vitae', 'profile', 'summary',
+        'objective', 'experience', 'education', 'skills', 'contact',
+        'phone', 'email', 'address', 'personal', 'details', 'information',
+        'professional', 'career', 'about', 'me', 'page', 'confidential',
+        'private', 'strictly', 'naukri', 'indeed', 'linkedin', 'http',
+        'https', 'www', 'gmail', 'yahoo', 'hotmail', 'outlook',
+        'mobile', 'tel', 'name', 'date', 'gender', 'nationality',
+        'references', 'available', 'upon', 'request', 'dear', 'sir',
+        'madam', 'to', 'whom', 'it', 'may', 'concern'
+    }
+
+    # Get first 15 non-empty lines of the resume
+    lines = resume_text.strip().split('\n')
+    candidate_lines = []
+    for line in lines:
+        cleaned = line.strip()
+        if cleaned and len(cleaned) > 1:
+            candidate_lines.append(cleaned)
+        if len(candidate_lines) >= 15:
+            break
+
+    for line in candidate_lines:
+        # Skip lines that are too long (likely paragraphs, not names)
+        if len(line) > 50:
+            continue
+
+        # Skip lines with email addresses
+        if '@' in line:
+            continue
+
+        # Skip lines with 7+ consecutive digits (phone numbers)
+        if re.search(r'\d{7,}', line):
+            continue
+
+        # Skip lines that are mostly numbers
+        digits = sum(c.isdigit() for c in line)
+        if digits > len(line) * 0.3:
+            continue
+
+        # Skip lines with URLs
+        if re.search(r'https?://|www\.', line, re.IGNORECASE):
+            continue
+
+        # Skip lines that are common headers
+        line_lower = line.lower().strip()
+        if line_lower in skip_words:
+            continue
+        if any(line_lower.startswith(w) for w in ['objective', 'summary', 'experience', 'education', 'skills', 'profile summary', 'contact', 'phone', 'email', 'mobile', 'address']):
+            continue
+
+        # Clean the line - remove special chars at edges
+        clean_line = re.sub(r'^[^a-zA-Z]+|[^a-zA-Z]+$', '', line.strip())
+        if not clean_line:
+            continue
+
+        # Try to match a name pattern: 2-4 words, predominantly letters
+        words = clean_line.split()
+        if 2 <= len(words) <= 4 and len(clean_line) < 40:
+            all_name_like = all(
+                len(w) >= 1 and w[0].isupper() and re.match(r'^[A-Za-z.]+$', w)
+                for w in words
+            )
+            if all_name_like:
+                lower_words = [w.lower().rstrip('.') for w in words]
+                if not any(w in skip_words for w in lower_words):
+                    return clean_line
+
+        # Also try: single CamelCase word that splits into 2-3 name parts
+        if len(words) == 1 and len(clean_line) >= 4:
+            split_name = split_camel_case(clean_line)
+            split_words = split_name.split()
+            if 2 <= len(split_words) <= 3:
+                all_alpha = all(w.isalpha() and w[0].isupper() for w in split_words)
+                if all_alpha:
+                    lower_words = [w.lower() for w in split_words]
+                    if not any(w in skip_words for w in lower_words):
+                        return split_name
+
+    return None
+
+
+## ===================== NAME DEDUPLICATION ===================== ##
+
+NAME_DUPLICATE_THRESHOLD = 85
+# Rows per cdist call inside one block, bounds the score matrix memory
+NAME_DEDUP_CHUNK = 512
+
+def _name_blocking_keys(name_key):
+    """Blocks a name falls into: a word start or end from each of two of its words.
+
+    Names that score >= 85 on token_sort_ratio keep the first two or the
+    last two letters of each word unless a typo hits both ends of a word, so
+    two such names share a pair of them. Pairs are far more selective than
+    single word starts ("^jo" alone holds every John and Joshua), so blocks
+    stay small as the backlog grows. That is not a guarantee: "alexandra
+    montgomery" and "aalexandraa mmontgomeryy" score 91 but share no block,
+    so this misses them where comparing every pair would not.
+    """
+    tokens = [token for token in set(name_key.split()) if len(token) >= 2]
+    ends = [("^" + token[:2], token[-2:] + "$") for token in tokens]
+    if len(ends) < 2:
+        return set(ends[0]) if ends else {name_key}
+    keys = {
+        min(a, b) + " " + max(a, b)
+        for first, second in itertools.combinations(ends, 2)
+        for a in first
+        for b in second
+    }
+    # A word this long can carry the score on its own ("amy williams" / "adam williams")
+    keys.update("=" + token for token in tokens if 2 * len(token) >= len(name_key))
+    return keys
+
+def dedupe_by_name(results, threshold=NAME_DUPLICATE_THRESHOLD):
+    """Drop repeat candidates by fuzzy name match, keeping the first occurrence.
+
+    results must be sorted best first, so the highest score is the one kept.
+    Names are grouped into blocks and compared with one process.cdist call
+    per block instead of every name against every earlier name - see
+    _name_blocking_keys for the rare pairs that blocking misses.
+    Returns (unique_results, duplicates_removed).
+    """
+    # (position in results, normalized name) for the first result with each usable name.
+    # A later result with the very same name is always a duplicate: of that first
+    # one if it was kept, else of the name that the first one duplicated.
+    names = []
+    first_seen = set()
+    repeats = set()
+    for i, res in enumerate(results):
+        name_key = res.get('candidate_name', '').strip().lower()
+        if not name_key or name_key == 'unknown':
+            continue
+        if name_key in first_seen:
+            repeats.add(i)
+        else:
+            first_seen.add(name_key)
+            names.append((i, name_key))
+
+    blocks = defaultdict(list)
+    for pos, (_, name_key) in enumerate(names):
+        for key in _name_blocking_keys(name_key):
+            blocks[key].append(pos)
+
+    # For each name, the earlier names it is similar to
+    similar_earlier = defaultdict(set)
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        block_names = [names[pos][1] for pos in members]
+        for start in range(0, len(members), NAME_DEDUP_CHUNK):
+            scores = process.cdist(
+                block_names[start:start + NAME_DEDUP_CHUNK], block_names,
+                scorer=fuzz.token_sort_ratio, score_cutoff=threshold, workers=-1
+            )
+            rows, cols = (scores >= threshold).nonzero()
+            # Members are in name order, so only the lower triangle pairs a name with earlier ones
+            earlier_pairs = cols < rows + start
+            for row, col in zip(rows[earlier_pairs].tolist(), cols[earlier_pairs].tolist()):
+                similar_earlier[members[start + row]].add(members[col])
+
+    # Walk in score order; a name is a duplicate only of a name that was kept
+    name_positions = {i: pos for pos, (i, _) in enumerate(names)}
+    kept = set()
+    unique_results = []
+    duplicates = 0
+    for i, res in enumerate(results):
+        pos = name_positions.get(i)
+        if i in repeats:
+            duplicates += 1
+        elif pos is None:
+            unique_results.append(res)
+        elif similar_earlier[pos] & kept:
+            duplicates += 1
+        else:
+            kept.add(pos)
+            unique_results.append(res)
+    return unique_results, duplicates
+
+
+## ===================== JD PROFILE ===================== ##
+
+# Same settings as calculate_tfidf_similarity - the profile reproduces its scores
+TFIDF_MAX_FEATURES = 5000
+_tfidf_analyzer = TfidfVectorizer(stop_words='english').build_analyzer()
+
+
+class JDProfile:
+    """Everything analyze_resume needs from the JD, computed once per batch"""
+
+    def __init__(self, job_description, nice_to_have_skills=None):
+        self.job_description = job_description
+
+        # Skills (lowercased once instead of per resume)
+        self.required_skills = extract_skills_from_jd(job_description)
+        self.required_skills_lower = [s.lower() for s in self.required_skills]
+        self.nice_to_have_skills = list(nice_to_have_skills or [])
+        self.nice_to_have_skills_lower = [s.lower() for s in self.nice_to_have_skills]
+        self.skill_matcher = SkillMatcher(self.required_skills + self.nice_to_have_skills)
+
+        # Experience requirement
+        self.required_years = scan_required_experience(job_description)
+
+        # JD side of the TF-IDF comparison, tokenized once
+        self.jd_term_counts = Counter(_tfidf_analyzer(job_description))
+
+    def tfidf_similarity(self, resume_text):
+        """Same result as calculate_tfidf_similarity(resume_text, JD) without re-tokenizing the JD.
+
+        With only two documents the smoothed IDF is 1 for shared terms and
+        ln(3/2) + 1 for terms in one document, so the fit reduces to counting.
+        """
+        resume_counts = Counter(_tfidf_analyzer(resume_text))
+        jd_counts = self.jd_term_counts
+        if len(resume_counts.keys() | jd_counts.keys()) > TFIDF_MAX_FEATURES:
+            # Vocabulary would be truncated - let scikit-learn pick the features
+            return calculate_tfidf_similarity(resume_text, self.job_description)
+        if not resume_counts and not jd_counts:
+            return 0
+
+        single_idf = math.log(3 / 2) + 1
+        dot = 0.0
+        resume_norm = 0.0
+        for term, count in resume_counts.items():
+            jd_count = jd_counts.get(term)
+            if jd_count:
+                dot += count * jd_count
+                resume_norm += count * count
+            else:
+                resume_norm += (count * single_idf) ** 2
+        jd_norm = 0.0
+        for term, count in jd_counts.items():
+            idf = 1 if term in resume_counts else single_idf
+            jd_norm += (count * idf) ** 2
+
+        if not resume_norm or not jd_norm:
+            return 0.0
+        similarity = dot / (math.sqrt(resume_norm) * math.sqrt(jd_norm))
+        return round(similarity * 100, 2)
+
+
+## ===================== HYBRID ANALYSIS ===================== ##
+
+JD_DUPLICATE_SIMILARITY = 95
+JD_DUPLICATE_RECOMMENDATION = "Possible JD Upload - Not a Resume"
+JD_DUPLICATE_SUMMARY = "WARNING: This file appears to be the Job Description itself (99%+ similarity), not a candidate resume."
+
+def check_jd_duplicate(result, tfidf_sim):
+    """Flag a result >95% similar to the JD as a JD upload, or lift an earlier flag, in place.
+
+    The summary the warning replaces is kept as unflagged_summary and comes back when the flag is lifted.
+    """
+    if tfidf_sim > JD_DUPLICATE_SIMILARITY:
+        result["verdict"] = "Not a Fit"
+        result["recommendation"] = JD_DUPLICATE_RECOMMENDATION
+        result.setdefault("unflagged_summary", result["summary"])
+        result["summary"] = JD_DUPLICATE_SUMMARY
+    elif "unflagged_summary" in result:
+        result["summary"] = result.pop("unflagged_summary")
+    return result
+
+def score_resume(resume_text, candidate_name, job_title, jd_profile, tfidf_sim=None):
+    """Deterministic ML scoring of one resume - no LLM call.
+
+    Returns a full result dict whose summary, strengths and weaknesses are the
+    template fallback; apply_llm_summary replaces them with the LLM's.
+    """
+    # ==================== STEP 1: ML-BASED SCORING (Deterministic) ====================
+
+    # 1a. Required skills come from the JD profile
+    required_skills = jd_profile.required_skills
+
+    # 1b. Skills matching with fuzzy logic (0-40 points)
+    # Required and nice-to-have skills are matched together in one fuzzy pass
+    (skills_matched, skills_missing), (nice_matched, _) = match_skill_lists(
+        [required_skills, jd_profile.nice_to_have_skills],
+        resume_text,
+        lowered_lists=[jd_profile.required_skills_lower, jd_profile.nice_to_have_skills_lower],
+        skill_matcher=jd_profile.skill_matcher
+    )
+    if required_skills:
+        skills_score = round((len(skills_matched) / len(required_skills)) * 40)
+    else:
+        skills_score = 20  # Default if no skills detected
+    skills_score = min(40, skills_score)
+
+    # Contact details, experience and education come from one scanner call
+    scanned = scan_resume(resume_text)
+
+    # 1c. Experience extraction and scoring (0-25 points)
+    candidate_years = scanned["experience_years"]
+    required_years = jd_profile.required_years
+    if required_years > 0:
+        exp_ratio = min(candidate_years / required_years, 1.5)  # Cap at 150%
+        experience_score = round(exp_ratio * 25)
+    elif candidate_years > 0:
+        experience_score = min(25, candidate_years * 3)  # 3 points per year
+    else:
+        experience_score = 10  # Default
+    experience_score = min(25, experience_score)
+
+    # 1d. Nice-to-have skills score (0-15 points), matched in 1b
+    nice_to_have_score = min(15, len(nice_matched) * 5)
+
+    # 1e. Education detection (0-10 points)
+    education_level, education_score = scanned["education_level"], scanned["education_score"]
+
+    # 1f. TF-IDF relevance score (0-10 points)
+    if tfidf_sim is None:
+        tfidf_sim = jd_profile.tfidf_similarity(resume_text)
+    relevance_score = min(10, round(tfidf_sim / 10))  # Convert 0-100 to 0-10
+
+    # ==================== TOTAL ML SCORE ====================
+    total_score = skills_score + experience_score + nice_to_have_score + education_score + relevance_score
+    total_score = min(100, max(0, total_score))
+
+    # Deterministic verdict
+    verdict, recommendation = calculate_verdict_from_score(total_score)
+
+    # Contact info extraction (regex)
+    email, phone, location = scanned["email"], scanned["phone"], scanned["location"]
+
+    # Template summary, used when the LLM call fails or is skipped
+    summary = f"Candidate has {candidate_years} years experience. Matched {len(skills_matched)}/{len(required_skills)} required skills."
+
+    result = {
+        "candidate_name": candidate_name,
+        "job_title": job_title,
+        "fit_score": total_score,
+        "verdict": verdict,
+        "recommendation": recommendation,
+        "email": email,
+        "phone": phone,
+        "location": location,
+        "current_role": "Not specified",
+        "experience_years": candidate_years,
+        "education_level": education_level,
+        "skills_matched": skills_matched,
+        "skills_missing": skills_missing,
+        "nice_to_have_matched": nice_matched,
+        "strengths": [f"{len(skills_matched)} skills matched"] if skills_matched else [],
+        "weaknesses": [f"{len(skills_missing)} skills missing"] if skills_missing else [],
+        "summary": summary,
+        "summary_source": "template",
+        "tfidf_similarity": tfidf_sim,
+        "score_breakdown": {
+            "skills_score": skills_score,
+            "experience_score": experience_score,
+            "nice_to_have_score": nice_to_have_score,
+            "education_score": education_score,
+            "relevance_score": relevance_score
+        }
+    }
+    # ==================== JD DUPLICATE DETECTION ====================
+    return check_jd_duplicate(result, tfidf_sim)
+
+SUMMARY_MAX_TOKENS = 400
+
+def build_summary_prompt(resume_text, job_title):
+    """LLM prompt asking for the candidate's name, role, strengths and a short summary"""
+    return f"""Analyze this resume briefly. Return ONLY valid JSON:
+{{
+    "candidate_name": "<full name of the candidate from the resume>",
+    "current_role": "<current/latest job title>",
+    "strengths": ["strength1", "strength2"],
+    "weaknesses": ["weakness1"],
+    "summary": "<2 sentence evaluation of this candidate for {job_title} role>"
+}}
+
+RESUME (first 2000 chars):
+{resume_text[:2000]}
+
+Return ONLY the JSON object."""
+
+def apply_llm_summary(result, llm_result):
+    """Merge an LLM summary reply into a score_resume result, in place"""
+    llm_candidate_name = llm_result.get("candidate_name", "")
+    result["current_role"] = llm_result.get("current_role", "Not specified")
+    result["strengths"] = llm_result.get("strengths", [])
+    result["weaknesses"] = llm_result.get("weaknesses", [])
+    if result["recommendation"] != JD_DUPLICATE_RECOMMENDATION:
+        result["summary"] = llm_result.get("summary", "")
+    else:
+        # The JD-upload warning stays on top; the summary is restored if the flag clears
+        result["unflagged_summary"] = llm_result.get("summary", "")
+    result["summary_source"] = "llm"
+
+    # Use LLM-extracted name if the current name looks like a job title or generic text
+    candidate_name = result["candidate_name"]
+    if llm_candidate_name and len(llm_candidate_name) > 2:
+        # Check if current name looks like a real person name (2-4 words, all alpha)
+        current_words = candidate_name.split()
+        looks_like_name = (
+            2 <= len(current_words) <= 4 and
+            all(w.isalpha() for w in current_words) and
+            len(candidate_name) < 40
+        )
+        if not looks_like_name:
+            # Current name doesn't look like a person - use LLM name
+            result["candidate_name"] = llm_candidate_name
+        elif any(kw in candidate_name.lower() for kw in ['senior', 'junior', 'manager', 'engineer', 'developer', 'analyst', 'scientist', 'lead', 'director', 'consultant', 'intern', 'associate', 'executive']):
+            # Current name contains job title keywords - use LLM name
+            result["candidate_name"] = llm_candidate_name
+    return result
+
+def analyze_resume(client, resume_text, job_description, nice_to_have_skills, candidate_name, job_title, jd_profile=None, tfidf_sim=None):
+    """HYBRID ML + LLM resume analysis - ML for scoring, LLM for summary only
+
+    Pass a JDProfile built once per batch to keep JD parsing out of the per-resume path,
+    and tfidf_sim to use a precomputed (e.g. batch_tfidf_similarities) relevance score.
+    """
+    if jd_profile is None:
+        jd_profile = JDProfile(job_description, nice_to_have_skills)
+
+    # STEP 1: ML-based scoring (deterministic)
+    result = score_resume(resume_text, candidate_name, job_title, jd_profile, tfidf_sim)
+
+    # STEP 2: LLM for summary + name
+    return summarize_resume(client, result, resume_text)
+
+def summarize_resume(client, result, resume_text):
+    """Add the LLM summary to a score_resume result, in place - the template summary stays on any failure"""
+    try:
+        llm_result = chat_json(client, build_summary_prompt(resume_text, result["job_title"]), max_tokens=SUMMARY_MAX_TOKENS)
+        apply_llm_summary(result, llm_result)
+    except:
+        pass
+    return result
+
+async def analyze_resume_async(client, resume_text, candidate_name, job_title, jd_profile, tfidf_sim=None, limiter=None, batcher=None):
+    """analyze_resume for the asyncio engine, on a shared AsyncGroq client.
+
+    The CPU-bound ML scoring runs on a worker thread so the event loop keeps
+    serving other in-flight LLM requests. With a SummaryBatcher the summary
+    request is packed together with other resumes'.
+    """
+    result = await asyncio.to_thread(score_resume, resume_text, candidate_name, job_title, jd_profile, tfidf_sim)
+    return await summarize_resume_async(client, result, resume_text, limiter=limiter, batcher=batcher)
+
+async def summarize_resume_async(client, result, resume_text, limiter=None, batcher=None, priority=None):
+    """Add the LLM summary to a score_resume result, in place - the template summary stays on any failure.
+
+    The ML fit score is the request's priority unless one is given, so the best candidates are summarized first.
+    """
+    if priority is None:
+        priority = result["fit_score"]
+    try:
+        if batcher is not None:
+            llm_result = await batcher.summarize(client, resume_text, priority)
+        else:
+            llm_result = await achat_json(
+                client, build_summary_prompt(resume_text, result["job_title"]), max_tokens=SUMMARY_MAX_TOKENS,
+                limiter=limiter, priority=priority
+            )
+        apply_llm_summary(result, llm_result)
+    except Exception:
+        pass
+    return result
+
+## ===================== LLM CASCADE ===================== ##
+
+# Cascade mode: every resume gets the ML score, only the best get an LLM summary
+CASCADE_TOP_K = int(os.getenv("CASCADE_TOP_K", "20"))
+CASCADE_MIN_SCORE = int(os.getenv("CASCADE_MIN_SCORE", "50"))  # below this is "Not a Fit"
+
+def select_for_summary(results, top_k=CASCADE_TOP_K, min_score=CASCADE_MIN_SCORE):
+    """Indices of the results worth an LLM summary: best first, fit_score >= min_score, at most top_k"""
+    ranked = sorted(range(len(results)), key=lambda i: results[i].get("fit_score", 0), reverse=True)
+    selected = [i for i in ranked if results[i].get("fit_score", 0) >= min_score]
+    return selected[:top_k] if top_k else selected
+
+# On-demand mode: summaries written up front in the background for this many top candidates
+LAZY_PREFETCH_COUNT = int(os.getenv("LAZY_PREFETCH_COUNT", "3"))
+
+## ===================== BATCHED SUMMARIES ===================== ##
+
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "5"))
+# How long a partly filled batch waits for more resumes before it is sent
+SUMMARY_BATCH_WAIT = 0.2
+
+def build_batch_summary_prompt(resume_texts, job_title):
+    """One prompt asking for the build_summary_prompt fields of several resumes, by id 1..n"""
+    resumes = "\n\n".join(
+        f"RESUME {i} (first 2000 chars):\n{text[:2000]}" for i, text in enumerate(resume_texts, 1)
+    )
+    return f"""Analyze each of these {len(resume_texts)} resumes briefly. Return ONLY a valid JSON array with one object per resume:
+[
+    {{
+        "id": <resume number>,
+        "candidate_name": "<full name of the candidate from the resume>",
+        "current_role": "<current/latest job title>",
+        "strengths": ["strength1", "strength2"],
+        "weaknesses": ["weakness1"],
+        "summary": "<2 sentence evaluation of this candidate for {job_title} role>"
+    }}
+]
+
+{resumes}
+
+Return ONLY the JSON array."""
+
+def split_batch_reply(reply, count):
+    """Map resume number (1..count) to its object in a batched reply; bad entries are left out"""
+    if isinstance(reply, dict):
+        # Some replies wrap the array, e.g. {"candidates": [...]}
+        reply = next((v for v in reply.values() if isinstance(v, list)), [])
+    if not isinstance(reply, list):
+        return {}
+
+    split = {}
+    for entry in reply:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            resume_id = int(str(entry.get("id")).strip().lstrip("#"))
+        except ValueError:
+            continue
+        if 1 <= resume_id <= count and resume_id not in split:
+            split[resume_id] = entry
+    return split
+
+class SummaryBatcher:
+    """Packs concurrent summary requests into multi-resume LLM calls.
+
+    Resumes already in the LLM cache are answered from it. The rest are sent
+    batch_size at a time and each answer is cached under its single-resume
+    prompt; any resume missing from (or garbled in) the batched reply falls
+    back to its own call.
+    """
+
+    def __init__(self, job_title, batch_size=SUMMARY_BATCH_SIZE, limiter=None, max_wait=SUMMARY_BATCH_WAIT):
+        self.job_title = job_title
+        self.batch_size = max(1, batch_size)
+        self.limiter = limiter
+        self.max_wait = max_wait
+        self.batched_requests = 0
+        self.batched_resumes = 0
+        self.single_requests = 0
+        self._pending = []  # (client, resume_text, prompt, future, priority)
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def summarize(self, client, resume_text, priority=0):
+        """Parsed summary reply for one resume (raises like achat_json if it cannot be had)"""
+        prompt = build_summary_prompt(resume_text, self.job_title)
+        cached = await asyncio.to_thread(cached_llm_reply, prompt, SUMMARY_MAX_TOKENS)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((client, resume_text, prompt, future, priority))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch):
+        client = batch[0][0]
+        answers = {}
+        if len(batch) > 1:
+            try:
+                # The batch prompt itself is not cached - its answers are, per resume
+                reply = await achat_json(
+                    client,
+                    build_batch_summary_prompt([text for _, text, _, _, _ in batch], self.job_title),
+                    max_tokens=SUMMARY_MAX_TOKENS * len(batch),
+                    limiter=self.limiter,
+                    use_cache=False,
+                    priority=max(priority for _, _, _, _, priority in batch)
+                )
+                answers = split_batch_reply(reply, len(batch))
+                self.batched_requests += 1
+                self.batched_resumes += len(answers)
+            except Exception:
+                answers = {}
+
+        async def resolve(resume_id, prompt, future, priority):
+            if resume_id in answers:
+                answer = answers[resume_id]
+                await asyncio.to_thread(store_llm_reply, prompt, SUMMARY_MAX_TOKENS, answer)
+            else:
+                # A lone leftover, or missing from the batched reply
+                self.single_requests += 1
+                try:
+                    answer = await achat_json(
+                        client, prompt, max_tokens=SUMMARY_MAX_TOKENS, limiter=self.limiter, priority=priority
+                    )
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    return
+            if not future.done():
+                future.set_result(answer)
+
+        await asyncio.gather(*(
+            resolve(resume_id, prompt, future, priority)
+            for resume_id, (_, _, prompt, future, priority) in enumerate(batch, 1)
+        ))
+
+    def stats(self):
+        return {
+            "batched_requests": self.batched_requests,
+            "batched_resumes": self.batched_resumes,
+            "single_requests": self.single_requests,
+        }
+
+def apply_relevance(result, tfidf_sim):
+    """Re-score an analyze_resume result with a new TF-IDF similarity, in place.
+
+    Used to fill in batch_tfidf_similarities once the whole batch is known:
+    updates the relevance score, total, verdict and the JD-upload check.
+    """
+    breakdown = result["score_breakdown"]
+    breakdown["relevance_score"] = min(10, round(tfidf_sim / 10))
+    total_score = min(100, max(0, sum(breakdown.values())))
+
+    result["tfidf_similarity"] = tfidf_sim
+    result["fit_score"] = total_score
+    result["verdict"], result["recommendation"] = calculate_verdict_from_score(total_score)
+
+    return check_jd_duplicate(result, tfidf_sim)
@@ -1,21 +1,28 @@
 import streamlit as st
-import json
-import re
 import os
-import hashlib
+import heapq
+import sqlite3
+import time
 from pathlib import Path
 from groq import Groq
-import PyPDF2
 import io
 import pandas as pd
 from dotenv import load_dotenv
-from docx import Document
-from fpdf import FPDF
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from rapidfuzz import fuzz, process
+from folder_manifest import FolderManifest
+from folder_scan import find_resume_files
+from near_duplicates import NEAR_DUPLICATE_THRESHOLD
+from reports import create_excel_report, generate_pdf_report
+from screening import BATCH_RELEVANCE, ScreeningRun
+from analysis import (
+    CASCADE_MIN_SCORE,
+    CASCADE_TOP_K,
+    LAZY_PREFETCH_COUNT,
+    SUMMARY_BATCH_SIZE,
+    extract_keywords_from_jd,
+    get_content_hash,
+    select_for_summary,
+)
+from summary_worker import SummaryWorker
 
 # Load environment variables from .env file
 load_dotenv()
@@ -348,6 +355,28 @@ if 'folder_pdf_paths' not in st.session_state:
     st.session_state.folder_pdf_paths = []
 if 'duplicates_count' not in st.session_state:
     st.session_state.duplicates_count = 0
+if 'near_duplicates_count' not in st.session_state:
+    st.session_state.near_duplicates_count = 0
+if 'llm_cache_stats' not in st.session_state:
+    st.session_state.llm_cache_stats = None
+if 'llm_limiter_stats' not in st.session_state:
+    st.session_state.llm_limiter_stats = None
+if 'summary_batch_stats' not in st.session_state:
+    st.session_state.summary_batch_stats = None
+if 'llm_summarized_count' not in st.session_state:
+    st.session_state.llm_summarized_count = None
+if 'resume_texts' not in st.session_state:
+    st.session_state.resume_texts = {}
+if 'summary_prefetch' not in st.session_state:
+    st.session_state.summary_prefetch = None
+if 'summary_worker' not in st.session_state:
+    st.session_state.summary_worker = None
+if 'resumed_count' not in st.session_state:
+    st.session_state.resumed_count = 0
+if 'folder_scan_root' not in st.session_state:
+    st.session_state.folder_scan_root = None
+if 'folder_changes' not in st.session_state:
+    st.session_state.folder_changes = None
 if 'total_files_processed' not in st.session_state:
     st.session_state.total_files_processed = 0
 if 'suggested_keywords' not in st.session_state:
@@ -355,630 +384,59 @@ if 'suggested_keywords' not in st.session_state:
 if 'job_title' not in st.session_state:
     st.session_state.job_title = ""
 
-def extract_text_from_pdf(pdf_file):
-    """Extract text from uploaded PDF file"""
-    try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() or ""
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    except Exception as e:
-        return f"Error extracting text: {str(e)}"
-
-def extract_text_from_pdf_path(pdf_path):
-    """Extract text from PDF file path (for folder upload)"""
-    try:
-        with open(pdf_path, 'rb') as f:
-            pdf_reader = PyPDF2.PdfReader(f)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() or ""
-            text = re.sub(r'\s+', ' ', text).strip()
-            return text
-    except Exception as e:
-        return f"Error extracting text: {str(e)}"
-
-def extract_text_from_docx(docx_file):
-    """Extract text from uploaded DOCX file"""
-    try:
-        doc = Document(io.BytesIO(docx_file.read()))
-        text = ""
-        for para in doc.paragraphs:
-            text += para.text + " "
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    text += cell.text + " "
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    except Exception as e:
-        return f"Error extracting text: {str(e)}"
-
-def extract_text_from_docx_path(docx_path):
-    """Extract text from DOCX file path (for folder upload)"""
-    try:
-        doc = Document(docx_path)
-        text = ""
-        for para in doc.paragraphs:
-            text += para.text + " "
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    text += cell.text + " "
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    except Exception as e:
-        return f"Error extracting text: {str(e)}"
-
-def get_content_hash(text):
-    """Generate hash of resume content for duplicate detection"""
-    normalized = re.sub(r'\s+', ' ', text.lower().strip())
-    return hashlib.md5(normalized.encode()).hexdigest()
-
-def extract_keywords_from_jd(client, job_description):
-    """Extract suggested keywords from job description using AI"""
-    prompt = f"""Analyze the following job description and extract key skills, technologies, and qualifications.
-
-Return ONLY valid JSON in this exact format:
-{{
-    "job_title": "<extracted job title>",
-    "must_have_skills": ["skill1", "skill2", "skill3"],
-    "nice_to_have_skills": ["skill1", "skill2"],
-    "technologies": ["tech1", "tech2"],
-    "qualifications": ["qual1", "qual2"],
-    "experience_required": "<e.g., 3-5 years>"
-}}
-
-JOB DESCRIPTION:
-{job_description[:3000]}
-
-Return ONLY the JSON object."""
-
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0,
-            max_tokens=800,
-            seed=42
-        )
-        result_text = response.choices[0].message.content.strip()
-
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0]
-        elif "```" in result_text:
-            result_text = result_text.split("```")[1].split("```")[0]
-
-        return json.loads(result_text)
-    except:
-        return {"job_title": "", "must_have_skills": [], "nice_to_have_skills": [], "technologies": [], "qualifications": [], "experience_required": ""}
-
-## ===================== ML SCORING FUNCTIONS ===================== ##
-
-def extract_contact_info(text):
-    """Extract email, phone, location using regex - NO LLM needed"""
-    # Email
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = re.findall(email_pattern, text)
-    email = emails[0] if emails else "Not provided"
-
-    # Phone (Indian + international formats)
-    phone_patterns = [
-        r'(?:\+91[\s-]?)?[6-9]\d{4}[\s-]?\d{5}',  # Indian mobile
-        r'(?:\+91[\s-]?)?\d{5}[\s-]?\d{5}',          # 10 digit
-        r'(?:\+\d{1,3}[\s-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}',  # US/intl
-        r'\d{3}[\s-]\d{3}[\s-]\d{4}',                 # XXX-XXX-XXXX
-    ]
-    phone = "Not provided"
-    for pattern in phone_patterns:
-        phones = re.findall(pattern, text)
-        if phones:
-            phone = phones[0].strip()
-            break
-
-    # Location - common Indian cities + international
-    cities = [
-        "Mumbai", "Delhi", "Bangalore", "Bengaluru", "Hyderabad", "Chennai",
-        "Kolkata", "Pune", "Ahmedabad", "Jaipur", "Lucknow", "Kanpur",
-        "Nagpur", "Indore", "Thane", "Bhopal", "Visakhapatnam", "Vadodara",
-        "Gurgaon", "Gurugram", "Noida", "Chandigarh", "Coimbatore", "Kochi",
-        "Mysore", "Mysuru", "Surat", "Nashik", "Rajkot", "Ranchi",
-        "New York", "San Francisco", "London", "Dubai", "Singapore", "Toronto",
-        "Remote", "Work from home", "WFH", "Hybrid"
-    ]
-    location = "Not provided"
-    text_lower = text.lower()
-    for city in cities:
-        if city.lower() in text_lower:
-            location = city
-            break
-
-    return email, phone, location
-
-def extract_experience_years(text):
-    """Extract years of experience using regex - NO LLM needed"""
-    patterns = [
-        r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of)?\s*(?:experience|exp)',
-        r'experience\s*(?:of)?\s*(\d+)\+?\s*(?:years?|yrs?)',
-        r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:in|of)\s*(?:IT|software|development|engineering)',
-        r'total\s*(?:experience|exp)\s*(?:of)?\s*(\d+)',
-        r'(\d+)\s*(?:years?|yrs?)\s*(\d+)\s*(?:months?|mos?)',
-    ]
-    years = 0
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            match = matches[0]
-            if isinstance(match, tuple):
-                years = int(match[0])
-            else:
-                years = int(match)
-            break
-    return years
-
-def extract_required_experience(jd_text):
-    """Extract required years from JD"""
-    patterns = [
-        r'(\d+)\s*[-–to]+\s*(\d+)\+?\s*(?:years?|yrs?)',  # "5-10+ years", "5-10 years"
-        r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of)?\s*(?:experience|exp)',  # "5+ years of experience"
-        r'minimum\s*(\d+)\s*(?:years?|yrs?)',  # "minimum 5 years"
-        r'(\d+)\+?\s*(?:years?|yrs?)',  # Simple fallback: "5+ years", "5 years"
-    ]
-    for pattern in patterns:
-        matches = re.findall(pattern, jd_text, re.IGNORECASE)
-        if matches:
-            match = matches[0]
-            if isinstance(match, tuple):
-                return int(match[0])  # Take lower bound
-            return int(match)
-    return 0
-
-def extract_education(text):
-    """Detect education level from resume text - NO LLM needed"""
-    text_lower = text.lower()
-
-    # Check for degrees (highest first)
-    phd_keywords = ['ph.d', 'phd', 'doctorate', 'doctoral']
-    masters_keywords = ['m.tech', 'mtech', 'm.sc', 'msc', 'mba', 'm.e.', 'masters', 'master of', 'ms in', 'm.s.', 'mca', 'm.c.a']
-    bachelors_keywords = ['b.tech', 'btech', 'b.sc', 'bsc', 'b.e.', 'bachelor', 'bca', 'b.c.a', 'b.eng', 'beng', 'b.com']
-    diploma_keywords = ['diploma', 'polytechnic', 'certification', 'certified']
-
-    for kw in phd_keywords:
-        if kw in text_lower:
-            return "PhD", 10
-    for kw in masters_keywords:
-        if kw in text_lower:
-            return "Masters", 10
-    for kw in bachelors_keywords:
-        if kw in text_lower:
-            return "Bachelors", 7
-    for kw in diploma_keywords:
-        if kw in text_lower:
-            return "Diploma", 5
-
-    return "Not detected", 3
-
-def extract_skills_from_jd(jd_text):
-    """Extract required skills from job description using keyword patterns"""
-    # Common tech skills to look for
-    common_skills = [
-        "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust", "Ruby",
-        "React", "Angular", "Vue", "Node.js", "Express", "Django", "Flask", "FastAPI",
-        "Spring Boot", "Spring", ".NET", "Laravel", "Rails",
-        "SQL", "MySQL", "PostgreSQL", "MongoDB", "Redis", "Elasticsearch", "Cassandra",
-        "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Jenkins", "CI/CD",
-        "Git", "GitHub", "GitLab", "Bitbucket",
-        "Machine Learning", "Deep Learning", "NLP", "Computer Vision", "AI",
-        "TensorFlow", "PyTorch", "Scikit-learn", "Pandas", "NumPy",
-        "Power BI", "Tableau", "Excel", "Data Analysis", "Data Science", "Data Engineering",
-        "REST", "API", "GraphQL", "Microservices", "SOA",
-        "Linux", "Unix", "Windows Server", "Networking",
-        "Agile", "Scrum", "JIRA", "Confluence",
-        "HTML", "CSS", "SASS", "Bootstrap", "Tailwind",
-        "Spark", "Hadoop", "Kafka", "Airflow", "ETL",
-        "Selenium", "JUnit", "pytest", "Testing", "QA",
-        "Figma", "Photoshop", "UI/UX",
-        "SAP", "Salesforce", "ServiceNow", "Oracle",
-        "Pyramid Analytics", "model monitoring", "drift detection",
-        "R", "SAS", "SPSS", "MATLAB",
-        "communication", "leadership", "problem-solving", "teamwork",
-    ]
-
-    jd_lower = jd_text.lower()
-    found_skills = []
-    for skill in common_skills:
-        if skill.lower() in jd_lower:
-            found_skills.append(skill)
-
-    # Also extract quoted or bulleted skills
-    bullet_pattern = r'[•\-\*]\s*([A-Za-z][A-Za-z\s/\.#\+]{2,30})'
-    bullets = re.findall(bullet_pattern, jd_text)
-    for b in bullets:
-        b_clean = b.strip()
-        if b_clean and b_clean not in found_skills and len(b_clean) < 30:
-            found_skills.append(b_clean)
-
-    return sorted(set(found_skills), key=str.lower) if found_skills else ["General skills"]
-
-def fuzzy_match_skills(required_skills, resume_text, threshold=70):
-    """Match skills using fuzzy string matching - handles typos and variations"""
-    resume_lower = resume_text.lower()
-    matched = []
-    missing = []
-
-    for skill in required_skills:
-        skill_lower = skill.lower()
-
-        # Exact match first
-        if skill_lower in resume_lower:
-            matched.append(skill)
-            continue
-
-        # Fuzzy match - check against words/phrases in resume
-        resume_words = re.findall(r'[a-zA-Z][a-zA-Z\s/\.#\+]{2,30}', resume_text)
-        best_match = process.extractOne(skill_lower, [w.lower() for w in resume_words], scorer=fuzz.ratio)
-
-        if best_match and best_match[1] >= threshold:
-            matched.append(skill)
-        else:
-            missing.append(skill)
-
-    return matched, missing
-
-def fuzzy_match_nice_to_have(nice_to_have_skills, resume_text, threshold=70):
-    """Match nice-to-have skills using fuzzy matching"""
-    if not nice_to_have_skills:
-        return []
-    resume_lower = resume_text.lower()
-    matched = []
-    for skill in nice_to_have_skills:
-        skill_lower = skill.lower()
-        if skill_lower in resume_lower:
-            matched.append(skill)
-            continue
-        resume_words = re.findall(r'[a-zA-Z][a-zA-Z\s/\.#\+]{2,30}', resume_text)
-        best_match = process.extractOne(skill_lower, [w.lower() for w in resume_words], scorer=fuzz.ratio)
-        if best_match and best_match[1] >= threshold:
-            matched.append(skill)
-    return matched
-
-def calculate_tfidf_similarity(resume_text, jd_text):
-    """Calculate text similarity between resume and JD using TF-IDF"""
-    try:
-        vectorizer = TfidfVectorizer(stop_words='english', max_features=5000)
-        tfidf_matrix = vectorizer.fit_transform([resume_text, jd_text])
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        return round(similarity * 100, 2)
-    except:
-        return 0
-
-def calculate_verdict_from_score(score):
-    """Calculate verdict deterministically from score - NO LLM involvement"""
-    score = max(0, min(100, score))
-
-    if score >= 85:
-        return "Best Fit", "Recommend for Interview"
-    elif score >= 70:
-        return "Strong Fit", "Recommend for Interview"
-    elif score >= 50:
-        return "Average", "Consider for Interview"
+def get_summary_worker():
+    """This session's background summary writer - prefetches and Summarize clicks share its rate limiter"""
+    if st.session_state.summary_worker is None:
+        st.session_state.summary_worker = SummaryWorker(GROQ_API_KEY)
+    return st.session_state.summary_worker
+
+def apply_prefetched_summaries():
+    """Copy summaries finished in the background onto the session's results.
+
+    Runs on the script thread, so rendering never sees a half-updated result.
+    """
+    prefetch = st.session_state.get("summary_prefetch")
+    if prefetch is None or prefetch[1].empty():
+        return
+    by_key = {result.get("resume_key"): result for result in st.session_state.results}
+    while not prefetch[1].empty():
+        resume_key, summarized = prefetch[1].get()
+        if resume_key in by_key:
+            by_key[resume_key].update(summarized)
+
+@st.fragment(run_every=2)
+def watch_summary_prefetch():
+    """Show the prefetch status and rerun the page once its summaries are in"""
+    prefetch = st.session_state.get("summary_prefetch")
+    if prefetch is None:
+        return
+    if not prefetch[0].done():
+        st.caption("✍️ Writing summaries for the top candidates in the background...")
     else:
-        return "Not a Fit", "Do Not Recommend"
-
-
-## ===================== NAME EXTRACTION ===================== ##
-
-def split_camel_case(text):
-    """Split CamelCase into separate words: 'AnkitDarade' -> 'Ankit Darade'"""
-    result = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-    result = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1 \2', result)
-    return result
-
-def clean_candidate_name(file_name):
-    """Remove platform prefixes, experience suffixes, and clean up filename for display"""
-    name = file_name
-
-    # Remove file extensions
-    for ext in ['.pdf', '.PDF', '.docx', '.DOCX', '.doc', '.DOC']:
-        name = name.replace(ext, '')
-
-    # Remove common job portal prefixes (case-insensitive)
-    platform_prefixes = [
-        r'(?i)^naukri[_\-\s]+',
-        r'(?i)^indeed[_\-\s]+',
-        r'(?i)^linkedin[_\-\s]+',
-        r'(?i)^monster[_\-\s]+',
-        r'(?i)^shine[_\-\s]+',
-        r'(?i)^timesjobs[_\-\s]+',
-        r'(?i)^glassdoor[_\-\s]+',
-        r'(?i)^foundit[_\-\s]+',
-        r'(?i)^ziprecruiter[_\-\s]+',
-        r'(?i)^hirect[_\-\s]+',
-        r'(?i)^instahyre[_\-\s]+',
-        r'(?i)^apna[_\-\s]+',
-        r'(?i)^iimjobs[_\-\s]+',
-        r'(?i)^cutshort[_\-\s]+',
-        r'(?i)^hirist[_\-\s]+',
-        r'(?i)^angellist[_\-\s]+',
-        r'(?i)^wellfound[_\-\s]+',
-    ]
-    for prefix in platform_prefixes:
-        name = re.sub(prefix, '', name)
-
-    # Remove experience tags like [6y_0m], [5y 6m], (6y_0m), [2y_3m], etc.
-    name = re.sub(r'[\[\(]\d+y[\s_\-]?\d*m?[\]\)]', '', name)
-
-    # Remove trailing numbers in brackets/parens like (1), [1], (2), [2]
-    name = re.sub(r'[\[\(]\d+[\]\)]', '', name)
-
-    # Remove date patterns like _12_01_26, _12-01-2026, _2026_01_12
-    name = re.sub(r'[_\-]?\d{1,2}[_\-]\d{1,2}[_\-]\d{2,4}', '', name)
-    name = re.sub(r'[_\-]?\d{4}[_\-]\d{1,2}[_\-]\d{1,2}', '', name)
-
-    # Replace underscores and hyphens with spaces
-    name = name.replace('_', ' ').replace('-', ' ')
-
-    # Split CamelCase: "AnkitDarade" -> "Ankit Darade"
-    name = split_camel_case(name)
-
-    # Remove "Resume", "CV", etc. AFTER underscores are replaced (so \b works correctly)
-    name = re.sub(r'(?i)\b(resume|cv|curriculum\s*vitae)\b', '', name)
-
-    # Remove extra whitespace
-    name = re.sub(r'\s+', ' ', name).strip()
-
-    # Remove any remaining lone numbers
-    name = re.sub(r'\b\d+\b', '', name).strip()
-    name = re.sub(r'\s+', ' ', name).strip()
-
-    return name if name else file_name
-
-
-def extract_name_from_resume(resume_text):
-    """Extract candidate name from resume text content.
-    Looks at the first few lines for a name pattern (2-4 capitalized words)."""
-    if not resume_text or resume_text.startswith("Error"):
-        return None
-
-    # Words that are NOT names - common resume headers/labels
-    skip_words = {
-        'resume', 'cv', 'curriculum', 'vitae', 'profile', 'summary',
-        'objective', 'experience', 'education', 'skills', 'contact',
-        'phone', 'email', 'address', 'personal', 'details', 'information',
-        'professional', 'career', 'about', 'me', 'page', 'confidential',
-        'private', 'strictly', 'naukri', 'indeed', 'linkedin', 'http',
-        'https', 'www', 'gmail', 'yahoo', 'hotmail', 'outlook',
-        'mobile', 'tel', 'name', 'date', 'gender', 'nationality',
-        'references', 'available', 'upon', 'request', 'dear', 'sir',
-        'madam', 'to', 'whom', 'it', 'may', 'concern'
-    }
-
-    # Get first 15 non-empty lines of the resume
-    lines = resume_text.strip().split('\n')
-    candidate_lines = []
-    for line in lines:
-        cleaned = line.strip()
-        if cleaned and len(cleaned) > 1:
-            candidate_lines.append(cleaned)
-        if len(candidate_lines) >= 15:
-            break
-
-    for line in candidate_lines:
-        # Skip lines that are too long (likely paragraphs, not names)
-        if len(line) > 50:
-            continue
-
-        # Skip lines with email addresses
-        if '@' in line:
-            continue
-
-        # Skip lines with 7+ consecutive digits (phone numbers)
-        if re.search(r'\d{7,}', line):
-            continue
-
-        # Skip lines that are mostly numbers
-        digits = sum(c.isdigit() for c in line)
-        if digits > len(line) * 0.3:
-            continue
-
-        # Skip lines with URLs
-        if re.search(r'https?://|www\.', line, re.IGNORECASE):
-            continue
-
-        # Skip lines that are common headers
-        line_lower = line.lower().strip()
-        if line_lower in skip_words:
-            continue
-        if any(line_lower.startswith(w) for w in ['objective', 'summary', 'experience', 'education', 'skills', 'profile summary', 'contact', 'phone', 'email', 'mobile', 'address']):
-            continue
-
-        # Clean the line - remove special chars at edges
-        clean_line = re.sub(r'^[^a-zA-Z]+|[^a-zA-Z]+$', '', line.strip())
-        if not clean_line:
-            continue
-
-        # Try to match a name pattern: 2-4 words, predominantly letters
-        words = clean_line.split()
-        if 2 <= len(words) <= 4 and len(clean_line) < 40:
-            all_name_like = all(
-                len(w) >= 1 and w[0].isupper() and re.match(r'^[A-Za-z.]+$', w)
-                for w in words
-            )
-            if all_name_like:
-                lower_words = [w.lower().rstrip('.') for w in words]
-                if not any(w in skip_words for w in lower_words):
-                    return clean_line
-
-        # Also try: single CamelCase word that splits into 2-3 name parts
-        if len(words) == 1 and len(clean_line) >= 4:
-            split_name = split_camel_case(clean_line)
-            split_words = split_name.split()
-            if 2 <= len(split_words) <= 3:
-                all_alpha = all(w.isalpha() and w[0].isupper() for w in split_words)
-                if all_alpha:
-                    lower_words = [w.lower() for w in split_words]
-                    if not any(w in skip_words for w in lower_words):
-                        return split_name
-
-    return None
-
-
-## ===================== HYBRID ANALYSIS ===================== ##
-
-def analyze_resume(client, resume_text, job_description, nice_to_have_skills, candidate_name, job_title):
-    """HYBRID ML + LLM resume analysis - ML for scoring, LLM for summary only"""
-
-    # ==================== STEP 1: ML-BASED SCORING (Deterministic) ====================
-
-    # 1a. Extract required skills from JD
-    required_skills = extract_skills_from_jd(job_description)
-
-    # 1b. Skills matching with fuzzy logic (0-40 points)
-    skills_matched, skills_missing = fuzzy_match_skills(required_skills, resume_text)
-    if required_skills:
-        skills_score = round((len(skills_matched) / len(required_skills)) * 40)
-    else:
-        skills_score = 20  # Default if no skills detected
-    skills_score = min(40, skills_score)
-
-    # 1c. Experience extraction and scoring (0-25 points)
-    candidate_years = extract_experience_years(resume_text)
-    required_years = extract_required_experience(job_description)
-    if required_years > 0:
-        exp_ratio = min(candidate_years / required_years, 1.5)  # Cap at 150%
-        experience_score = round(exp_ratio * 25)
-    elif candidate_years > 0:
-        experience_score = min(25, candidate_years * 3)  # 3 points per year
-    else:
-        experience_score = 10  # Default
-    experience_score = min(25, experience_score)
-
-    # 1d. Nice-to-have skills matching (0-15 points)
-    nice_matched = fuzzy_match_nice_to_have(nice_to_have_skills, resume_text)
-    nice_to_have_score = min(15, len(nice_matched) * 5)
-
-    # 1e. Education detection (0-10 points)
-    education_level, education_score = extract_education(resume_text)
-
-    # 1f. TF-IDF relevance score (0-10 points)
-    tfidf_sim = calculate_tfidf_similarity(resume_text, job_description)
-    relevance_score = min(10, round(tfidf_sim / 10))  # Convert 0-100 to 0-10
-
-    # ==================== TOTAL ML SCORE ====================
-    total_score = skills_score + experience_score + nice_to_have_score + education_score + relevance_score
-    total_score = min(100, max(0, total_score))
-
-    # Deterministic verdict
-    verdict, recommendation = calculate_verdict_from_score(total_score)
-
-    # Contact info extraction (regex)
-    email, phone, location = extract_contact_info(resume_text)
-
-    # ==================== JD DUPLICATE DETECTION ====================
-    is_jd_duplicate = tfidf_sim > 95  # Flag if resume is >95% similar to JD
-
-    # ==================== STEP 2: LLM FOR SUMMARY + NAME ====================
-    summary = ""
-    current_role = "Not specified"
-    strengths = []
-    weaknesses = []
-    llm_candidate_name = ""
-
-    try:
-        prompt = f"""Analyze this resume briefly. Return ONLY valid JSON:
-{{
-    "candidate_name": "<full name of the candidate from the resume>",
-    "current_role": "<current/latest job title>",
-    "strengths": ["strength1", "strength2"],
-    "weaknesses": ["weakness1"],
-    "summary": "<2 sentence evaluation of this candidate for {job_title} role>"
-}}
-
-RESUME (first 2000 chars):
-{resume_text[:2000]}
-
-Return ONLY the JSON object."""
-
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0,
-            max_tokens=400,
-            seed=42
-        )
-        result_text = response.choices[0].message.content.strip()
-
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0]
-        elif "```" in result_text:
-            result_text = result_text.split("```")[1].split("```")[0]
-
-        llm_result = json.loads(result_text)
-        llm_candidate_name = llm_result.get("candidate_name", "")
-        current_role = llm_result.get("current_role", "Not specified")
-        strengths = llm_result.get("strengths", [])
-        weaknesses = llm_result.get("weaknesses", [])
-        summary = llm_result.get("summary", "")
-
-    except:
-        summary = f"Candidate has {candidate_years} years experience. Matched {len(skills_matched)}/{len(required_skills)} required skills."
-        current_role = "Not specified"
-        strengths = [f"{len(skills_matched)} skills matched"] if skills_matched else []
-        weaknesses = [f"{len(skills_missing)} skills missing"] if skills_missing else []
-
-    # Use LLM-extracted name if the current name looks like a job title or generic text
-    final_name = candidate_name
-    if llm_candidate_name and len(llm_candidate_name) > 2:
-        # Check if current name looks like a real person name (2-4 words, all alpha)
-        current_words = candidate_name.split()
-        looks_like_name = (
-            2 <= len(current_words) <= 4 and
-            all(w.isalpha() for w in current_words) and
-            len(candidate_name) < 40
-        )
-        if not looks_like_name:
-            # Current name doesn't look like a person - use LLM name
-            final_name = llm_candidate_name
-        elif any(kw in candidate_name.lower() for kw in ['senior', 'junior', 'manager', 'engineer', 'developer', 'analyst', 'scientist', 'lead', 'director', 'consultant', 'intern', 'associate', 'executive']):
-            # Current name contains job title keywords - use LLM name
-            final_name = llm_candidate_name
-
-    # Override for JD duplicates
-    if is_jd_duplicate:
-        verdict = "Not a Fit"
-        recommendation = "Possible JD Upload - Not a Resume"
-        summary = "WARNING: This file appears to be the Job Description itself (99%+ similarity), not a candidate resume."
-
-    # ==================== RETURN COMBINED RESULT ====================
-    return {
-        "candidate_name": final_name,
-        "job_title": job_title,
-        "fit_score": total_score,
-        "verdict": verdict,
-        "recommendation": recommendation,
-        "email": email,
-        "phone": phone,
-        "location": location,
-        "current_role": current_role,
-        "experience_years": candidate_years,
-        "education_level": education_level,
-        "skills_matched": skills_matched,
-        "skills_missing": skills_missing,
-        "nice_to_have_matched": nice_matched,
-        "strengths": strengths,
-        "weaknesses": weaknesses,
-        "summary": summary,
-        "tfidf_similarity": tfidf_sim,
-        "score_breakdown": {
-            "skills_score": skills_score,
-            "experience_score": experience_score,
-            "nice_to_have_score": nice_to_have_score,
-            "education_score": education_score,
-            "relevance_score": relevance_score
-        }
-    }
+        apply_prefetched_summaries()
+        st.session_state.summary_prefetch = None
+        st.rerun()
+
+# Live leaderboard shown while a run is in progress
+LIVE_LEADERBOARD_SIZE = 25
+LIVE_LEADERBOARD_INTERVAL = 0.5  # seconds between redraws
+
+def render_leaderboard(placeholder, results, note="", limit=LIVE_LEADERBOARD_SIZE):
+    """Redraw the live top-N table in its placeholder - nothing else on the page re-renders"""
+    top = heapq.nlargest(limit, list(results), key=lambda x: x.get('fit_score', 0))
+    rows = [{
+        "Candidate": result.get('candidate_name', 'Unknown'),
+        "Fit Score": result.get('fit_score', 0),
+        "Verdict": result.get('verdict', 'N/A'),
+        "Current Role": result.get('current_role', 'N/A'),
+        "Experience (Years)": result.get('experience_years', 0),
+        "Location": result.get('location', 'Not provided'),
+    } for result in top]
+    with placeholder.container():
+        st.markdown(f"**🏁 Live leaderboard** - top {len(rows)} of {len(results)} so far")
+        if note:
+            st.caption(note)
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
 
 def get_category_color(category):
     colors = {
@@ -989,90 +447,6 @@ def get_category_color(category):
     }
     return colors.get(category, ("#6b7280", "#f3f4f6"))
 
-
-def create_excel_report(results, categories, total_files, duplicates, job_title):
-    """Create Excel report with all candidate data"""
-    data = []
-    for result in results:
-        data.append({
-            "Candidate Name": result.get('candidate_name', 'Unknown'),
-            "Fit Score": result.get('fit_score', 0),
-            "Verdict": result.get('verdict', 'N/A'),
-            "Job Title Applied": job_title,
-            "Current Role": result.get('current_role', 'N/A'),
-            "Experience (Years)": result.get('experience_years', 0),
-            "Location": result.get('location', 'Not provided'),
-            "Email": result.get('email', 'Not provided'),
-            "Phone": result.get('phone', 'Not provided'),
-            "Skills Matched": ", ".join(result.get('skills_matched', [])),
-            "Skills Missing": ", ".join(result.get('skills_missing', [])),
-            "Nice-to-Have Skills": ", ".join(result.get('nice_to_have_matched', [])),
-            "Strengths": ", ".join(result.get('strengths', [])),
-            "Weaknesses": ", ".join(result.get('weaknesses', [])),
-            "Summary": result.get('summary', 'N/A'),
-            "Recommendation": result.get('recommendation', 'N/A')
-        })
-
-    df = pd.DataFrame(data)
-    return df
-
-def generate_pdf_report(results, job_title, categories, total_files, duplicates):
-    """Generate PDF Report for Resume Analysis"""
-
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-
-    # Title
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(200, 10, "AI Resume Shortlisting Report", ln=True, align="C")
-    pdf.ln(10)
-
-    # Job Title
-    pdf.set_font("Arial", "", 12)
-    pdf.cell(200, 10, f"Job Title: {job_title}", ln=True)
-    pdf.ln(5)
-
-    # Summary Section
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(200, 10, "Processing Summary", ln=True)
-
-    pdf.set_font("Arial", "", 11)
-    pdf.cell(200, 8, f"Total Files Uploaded: {total_files}", ln=True)
-    pdf.cell(200, 8, f"Unique Resumes Analyzed: {len(results)}", ln=True)
-    pdf.cell(200, 8, f"Duplicates Skipped: {duplicates}", ln=True)
-    pdf.ln(8)
-
-    # Category Breakdown
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(200, 10, "Results Breakdown", ln=True)
-
-    pdf.set_font("Arial", "", 11)
-    for cat, cat_results in categories.items():
-        pdf.cell(200, 8, f"{cat}: {len(cat_results)} candidates", ln=True)
-
-    pdf.ln(10)
-
-    # Top Candidates
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(200, 10, "Top Candidates", ln=True)
-
-    pdf.set_font("Arial", "", 10)
-    for result in results[:10]:
-        pdf.multi_cell(
-            0,
-            7,
-            f"Name: {result.get('candidate_name')}\n"
-            f"Score: {result.get('fit_score')}%\n"
-            f"Role: {result.get('current_role')}\n"
-            f"Location: {result.get('location')}\n"
-            f"Recommendation: {result.get('recommendation')}\n"
-            "----------------------------------------"
-        )
-
-    # ✅ Return PDF bytes
-    return pdf.output(dest="S").encode("latin-1")
-
 # Sidebar
 with st.sidebar:
     st.markdown("""
@@ -1220,20 +594,19 @@ with col1:
                 folder_path = None
 
             if folder_path and folder_path.exists() and folder_path.is_dir():
-                resume_files = (
-                    list(folder_path.glob("*.pdf")) +
-                    list(folder_path.glob("*.PDF")) +
-                    list(folder_path.glob("*.docx")) +
-                    list(folder_path.glob("*.DOCX")) +
-                    list(folder_path.glob("*.doc")) +
-                    list(folder_path.glob("*.DOC"))
-                )
+                # Read before scanning so the folder is only walked once
+                include_subfolders = st.checkbox("Include subfolders", value=False)
+                scan_started = time.perf_counter()
+                resume_files = find_resume_files(folder_path, recursive=include_subfolders)
+                scan_seconds = time.perf_counter() - scan_started
 
                 if resume_files:
-                    pdf_count = len([f for f in resume_files if f.suffix.lower() == '.pdf'])
-                    docx_count = len([f for f in resume_files if f.suffix.lower() in ['.docx', '.doc']])
-                    st.success(f"✅ Found {len(resume_files)} files ({pdf_count} PDF, {docx_count} DOCX/DOC)")
+                    pdf_count = len([f for f in resume_files if f.name.lower().endswith('.pdf')])
+                    docx_count = len(resume_files) - pdf_count
+                    where = " (with subfolders)" if include_subfolders else ""
+                    st.success(f"✅ Found {len(resume_files)} files{where} ({pdf_count} PDF, {docx_count} DOCX/DOC) in {scan_seconds:.1f}s")
                     st.session_state.folder_pdf_paths = resume_files
+                    st.session_state.folder_scan_root = (str(folder_path), include_subfolders)
 
                     file_chips = ""
                     for f in resume_files[:3]:
@@ -1241,19 +614,6 @@ with col1:
                     if len(resume_files) > 3:
                         file_chips += f'<span class="file-chip">+{len(resume_files)-3} others</span>'
                     st.markdown(file_chips, unsafe_allow_html=True)
-
-                    include_subfolders = st.checkbox("Include subfolders", value=False)
-                    if include_subfolders:
-                        resume_files = (
-                            list(folder_path.rglob("*.pdf")) +
-                            list(folder_path.rglob("*.PDF")) +
-                            list(folder_path.rglob("*.docx")) +
-                            list(folder_path.rglob("*.DOCX")) +
-                            list(folder_path.rglob("*.doc")) +
-                            list(folder_path.rglob("*.DOC"))
-                        )
-                        st.session_state.folder_pdf_paths = resume_files
-                        st.info(f"📂 Total with subfolders: {len(resume_files)} files")
                 else:
                     st.warning("⚠️ No PDF/DOCX files found in this folder")
                     st.session_state.folder_pdf_paths = []
@@ -1286,6 +646,73 @@ with col2:
     )
     nice_to_have_skills = [s.strip() for s in nice_to_have_input.split(",") if s.strip()] if nice_to_have_input else []
 
+    with st.expander("⚙️ Advanced Settings"):
+        batch_relevance = st.checkbox(
+            "Score relevance across the whole batch",
+            value=BATCH_RELEVANCE,
+            help="Fit one TF-IDF model on all resumes + JD, so skills every candidate lists weigh less than distinctive ones"
+        )
+        near_duplicate_threshold = st.slider(
+            "Near-duplicate similarity",
+            min_value=0.5,
+            max_value=1.0,
+            value=NEAR_DUPLICATE_THRESHOLD,
+            step=0.05,
+            help="Skip a resume whose text overlaps an earlier one at least this much (e.g. re-exports with a different footer). 1.0 turns it off."
+        )
+        batch_summaries = st.checkbox(
+            "Summarize several resumes per LLM request",
+            value=False,
+            help="Pack resumes into one request with a JSON array reply - far fewer requests under tight rate limits. Entries that fail to parse are retried on their own."
+        )
+        summary_batch_size = st.slider(
+            "Resumes per request",
+            min_value=2,
+            max_value=10,
+            value=SUMMARY_BATCH_SIZE,
+            disabled=not batch_summaries
+        )
+        llm_cascade = st.checkbox(
+            "Only summarize the top candidates with the LLM",
+            value=False,
+            help="Score every resume with the ML model first, then request LLM summaries for the best ones only. The rest keep the deterministic summary."
+        )
+        cascade_top_k = st.number_input(
+            "LLM summaries for the top",
+            min_value=1,
+            value=CASCADE_TOP_K,
+            disabled=not llm_cascade
+        )
+        cascade_min_score = st.slider(
+            "Minimum fit score for an LLM summary",
+            min_value=0,
+            max_value=100,
+            value=CASCADE_MIN_SCORE,
+            disabled=not llm_cascade
+        )
+        lazy_summaries = st.checkbox(
+            "Write LLM summaries on demand",
+            value=False,
+            help="Rank with ML scores only and fetch a candidate's LLM summary when you click Summarize. The top few are written in the background."
+        )
+        time_budget = st.number_input(
+            "Time budget (minutes, 0 = no limit)",
+            min_value=0.0,
+            value=0.0,
+            step=0.5,
+            help="LLM summaries still pending when the budget runs out use the deterministic ML summary instead, so the run finishes on time."
+        )
+        resume_runs = st.checkbox(
+            "Resume interrupted runs",
+            value=True,
+            help="Each result is saved as soon as it finishes. Re-running the same JD and settings skips resumes that were already analyzed."
+        )
+        incremental_folders = st.checkbox(
+            "Only read new and changed files in a folder",
+            value=True,
+            help="Remembers each folder's files (size, modified time, content hash). Re-running on the same folder with the same JD and settings reuses the results of unchanged files without opening them. With top-candidate or on-demand LLM summaries, unchanged files are still read, because those summaries need the text."
+        )
+
     # Feature 6: Suggest Keywords Button (always visible)
     if st.button("🔍 Extract Keywords from JD", use_container_width=True):
         if not job_description:
@@ -1372,179 +799,101 @@ if analyze_clicked:
             status_text = st.empty()
             time_estimate = st.empty()
             duplicate_info = st.empty()
+            live_leaderboard = st.empty()
 
             total = len(files_to_process)
 
-            # Parallel processing settings
-            MAX_WORKERS = min(5, total)  # Limit to 5 parallel requests (Groq rate limit friendly)
+            # Uploaded files are sent to workers as raw bytes, folder files as paths
+            if use_folder:
+                extraction_jobs = files_to_process
+            else:
+                extraction_jobs = [(file_item.getvalue(), file_item.name) for file_item in files_to_process]
+
+            # Incremental folder runs: the folder's files as of the last run
+            manifest = None
+            if use_folder and incremental_folders and st.session_state.folder_scan_root:
+                folder_root, recursive = st.session_state.folder_scan_root
+                try:
+                    manifest = FolderManifest(folder_root, scope=f"recursive={recursive}")
+                except sqlite3.Error:
+                    manifest = None
+
+            run = ScreeningRun(
+                extraction_jobs,
+                job_description,
+                job_title=job_title,
+                nice_to_have_skills=nice_to_have_skills,
+                api_key=GROQ_API_KEY,
+                llm_mode="lazy" if lazy_summaries else "cascade" if llm_cascade else "full",
+                batch_relevance=batch_relevance,
+                near_duplicate_threshold=near_duplicate_threshold,
+                summary_batch_size=summary_batch_size if batch_summaries else 0,
+                cascade_top_k=cascade_top_k,
+                cascade_min_score=cascade_min_score,
+                time_budget=time_budget,
+                resume=resume_runs,
+                manifest=manifest
+            )
 
             if total > 10:
-                est_time = (total // MAX_WORKERS) * 2  # Much faster with parallel
-                time_estimate.info(f"⚡ Parallel processing: ~{est_time // 60}m {est_time % 60}s for {total} resumes ({MAX_WORKERS} parallel workers)")
-
-            # Step 1: Extract text from all files first (fast, can be parallelized)
-            status_text.text("📄 Extracting text from resumes...")
-
-            extracted_data = []
-            seen_hashes = {}
-            duplicates_skipped = 0
-
-            for idx, file_item in enumerate(files_to_process):
-                if use_folder:
-                    file_path = file_item
-                    file_name = file_path.name
-                    file_ext = file_path.suffix.lower()
-
-                    if file_ext == '.pdf':
-                        resume_text = extract_text_from_pdf_path(file_path)
-                    elif file_ext in ['.docx', '.doc']:
-                        resume_text = extract_text_from_docx_path(file_path)
-                    else:
-                        resume_text = "Error: Unsupported file format"
-                else:
-                    file_name = file_item.name
-                    file_ext = Path(file_name).suffix.lower()
-
-                    if file_ext == '.pdf':
-                        resume_text = extract_text_from_pdf(file_item)
-                    elif file_ext in ['.docx', '.doc']:
-                        resume_text = extract_text_from_docx(file_item)
-                    else:
-                        resume_text = "Error: Unsupported file format"
-
-                # Clean the filename (remove platform prefixes, extensions, etc.)
-                clean_name = clean_candidate_name(file_name)
-
-                # Try to extract actual name from resume content
-                if not resume_text.startswith("Error"):
-                    extracted_name = extract_name_from_resume(resume_text)
-                    if extracted_name:
-                        clean_name = extracted_name
-
-                if resume_text.startswith("Error"):
-                    extracted_data.append({
-                        "candidate_name": clean_name,
-                        "job_title": job_title,
-                        "fit_score": 0,
-                        "error": resume_text,
-                        "verdict": "Error",
-                        "current_role": "Unknown",
-                        "location": "Not provided",
-                        "skills_matched": [],
-                        "skills_missing": [],
-                        "nice_to_have_matched": [],
-                        "summary": "Could not extract text from file",
-                        "is_error": True
-                    })
-                else:
-                    content_hash = get_content_hash(resume_text)
-
-                    if content_hash in seen_hashes:
-                        duplicates_skipped += 1
-                    else:
-                        seen_hashes[content_hash] = file_name
-                        extracted_data.append({
-                            "resume_text": resume_text,
-                            "candidate_name": clean_name,
-                            "is_error": False
-                        })
-
-                progress_bar.progress((idx + 1) / total * 0.3)  # 30% for extraction
-
-            if duplicates_skipped > 0:
-                duplicate_info.success(f"✅ Found {duplicates_skipped} duplicate(s) - will be skipped")
-
-            # Step 2: Parallel API calls for analysis
-            status_text.text(f"🚀 Analyzing {len([d for d in extracted_data if not d.get('is_error')])} resumes in parallel...")
-
-            results = []
-            resumes_to_analyze = [d for d in extracted_data if not d.get('is_error')]
-            error_results = [d for d in extracted_data if d.get('is_error')]
-
-            # Add error results directly
-            for err in error_results:
-                del err['is_error']
-                results.append(err)
-
-            # Thread-safe counter for progress
-            completed_count = [0]
-            lock = threading.Lock()
-
-            def analyze_single_resume(data):
-                """Analyze a single resume - called in parallel"""
-                client = Groq(api_key=GROQ_API_KEY)  # Each thread gets its own client
-                result = analyze_resume(
-                    client,
-                    data['resume_text'],
-                    job_description,
-                    nice_to_have_skills,
-                    data['candidate_name'],
-                    job_title
-                )
-
-                with lock:
-                    completed_count[0] += 1
-
-                return result
-
-            # Parallel execution
-            if resumes_to_analyze:
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures = {executor.submit(analyze_single_resume, data): data for data in resumes_to_analyze}
-
-                    for future in as_completed(futures):
-                        try:
-                            result = future.result()
-                            results.append(result)
-
-                            # Update progress (30% extraction + 70% analysis)
-                            progress = 0.3 + (completed_count[0] / len(resumes_to_analyze)) * 0.7
-                            progress_bar.progress(progress)
-                            status_text.text(f"🔍 Analyzed {completed_count[0]}/{len(resumes_to_analyze)} resumes...")
-
-                        except Exception as e:
-                            data = futures[future]
-                            results.append({
-                                "candidate_name": data['candidate_name'],
-                                "job_title": job_title,
-                                "fit_score": 0,
-                                "error": str(e),
-                                "verdict": "Error",
-                                "current_role": "Unknown",
-                                "location": "Not provided",
-                                "skills_matched": [],
-                                "skills_missing": [],
-                                "nice_to_have_matched": [],
-                                "summary": f"Error: {str(e)}"
-                            })
+                est_time = (total // run.llm_concurrency) * 2  # Much faster with parallel
+                time_estimate.info(f"⚡ Parallel processing: ~{est_time // 60}m {est_time % 60}s for {total} resumes ({run.llm_concurrency} concurrent requests)")
+
+            # Step 1+2: Extract text across a process pool (one worker per core) and hand each
+            # unique resume to concurrent API calls on one shared client as soon as it is ready
+            status_text.text("📄 Extracting and analyzing resumes...")
+
+            completed_count = 0
+            # Live scores leave out batch relevance until the whole batch is in
+            leaderboard_note = "Relevance scores are added when the run finishes." if batch_relevance else ""
+            last_render = 0.0
+            for _ in run.analyze():
+                completed_count += 1
+
+                # Every file is done once it is analyzed, failed extraction or was a duplicate
+                progress_bar.progress(min(run.files_done / total, 1.0))
+                status_text.text(f"🔍 Extracted {run.stats['extracted']}/{total} · Analyzed {completed_count} resumes...")
+
+                # Redraw the leaderboard at most every LIVE_LEADERBOARD_INTERVAL seconds
+                if time.monotonic() - last_render >= LIVE_LEADERBOARD_INTERVAL:
+                    render_leaderboard(live_leaderboard, run.results, leaderboard_note)
+                    last_render = time.monotonic()
+
+            # Step 3: One TF-IDF fit over the whole batch + JD for relevance scores
+            if batch_relevance:
+                status_text.text("📐 Scoring relevance across the batch...")
+            run.score_relevance()
+
+            # Step 4 (cascade): LLM summaries for the top-ranked candidates only
+            if llm_cascade and not lazy_summaries:
+                render_leaderboard(live_leaderboard, run.results)
+            for done_count, shortlist_size in run.summarize_top():
+                progress_bar.progress(done_count / shortlist_size)
+                status_text.text(f"✍️ Summarizing top candidates {done_count}/{shortlist_size}...")
+                if time.monotonic() - last_render >= LIVE_LEADERBOARD_INTERVAL:
+                    render_leaderboard(live_leaderboard, run.results)
+                    last_render = time.monotonic()
+
+            # On demand: keep the texts for the Summarize buttons, prefetch the top few now
+            st.session_state.resume_texts = {}
+            if st.session_state.summary_prefetch is not None:
+                # A new run's results replace the old ones - stop writing summaries for those
+                st.session_state.summary_prefetch[0].cancel()
+                st.session_state.summary_prefetch = None
+            if run.analyzed and lazy_summaries:
+                for result, resume_text in run.analyzed:
+                    result["resume_key"] = get_content_hash(resume_text)
+                    st.session_state.resume_texts[result["resume_key"]] = resume_text
+                top = select_for_summary([r for r, _ in run.analyzed], LAZY_PREFETCH_COUNT, 0)
+                if top:
+                    st.session_state.summary_prefetch = get_summary_worker().prefetch(
+                        [(run.analyzed[i][0]["resume_key"], *run.analyzed[i]) for i in top], time_budget
+                    )
 
             progress_bar.progress(1.0)
 
-            results.sort(key=lambda x: x.get('fit_score', 0), reverse=True)
-
-            # Name-based deduplication: if same candidate name appears multiple times,
-            # keep only the one with the highest score (using fuzzy matching for robustness)
-            seen_names = []
-            unique_results = []
-            name_duplicates = 0
-            for res in results:
-                name_key = res.get('candidate_name', '').strip().lower()
-                if not name_key or name_key == 'unknown':
-                    unique_results.append(res)
-                    continue
-                # Fuzzy match against already-seen names (handles LLM name variations)
-                is_duplicate = False
-                for seen in seen_names:
-                    if fuzz.token_sort_ratio(name_key, seen) >= 85:
-                        is_duplicate = True
-                        break
-                if is_duplicate:
-                    name_duplicates += 1
-                else:
-                    seen_names.append(name_key)
-                    unique_results.append(res)
-            results = unique_results
-            duplicates_skipped += name_duplicates
+            results = run.finish()
+            duplicates_skipped = run.stats["duplicates"] + run.stats["name_duplicates"]
 
             st.session_state.results = results
             st.session_state.analyzed = True
@@ -1553,9 +902,17 @@ if analyze_clicked:
             status_text.empty()
             progress_bar.empty()
             time_estimate.empty()
+            live_leaderboard.empty()
 
             st.session_state.duplicates_count = duplicates_skipped
+            st.session_state.near_duplicates_count = run.stats["near_duplicates"]
             st.session_state.total_files_processed = total
+            st.session_state.resumed_count = run.stats["resumed"]
+            st.session_state.folder_changes = manifest.stats if manifest else None
+            st.session_state.llm_cache_stats = run.llm_cache_stats()
+            st.session_state.llm_limiter_stats = run.limiter.stats()
+            st.session_state.summary_batch_stats = run.batcher.stats() if run.batcher else None
+            st.session_state.llm_summarized_count = run.llm_summarized
 
             if duplicates_skipped > 0:
                 duplicate_info.success(f"✅ Processed {len(results)} unique resumes. Skipped {duplicates_skipped} duplicate(s).")
@@ -1570,10 +927,19 @@ if analyze_clicked:
 # ✅ Display results ONLY after analysis
 if st.session_state.analyzed and st.session_state.results:
 
+    # Prefetched summaries that are already in show up on any rerun
+    apply_prefetched_summaries()
     results = st.session_state.results
     job_title = st.session_state.get("job_title", "Not specified")
     total_files = st.session_state.get("total_files_processed", len(results))
     duplicates = st.session_state.get("duplicates_count", 0)
+    near_duplicates = st.session_state.get("near_duplicates_count", 0)
+    llm_cache_stats = st.session_state.get("llm_cache_stats")
+    llm_limiter_stats = st.session_state.get("llm_limiter_stats")
+    summary_batch_stats = st.session_state.get("summary_batch_stats")
+    llm_summarized = st.session_state.get("llm_summarized_count")
+    resumed = st.session_state.get("resumed_count", 0)
+    folder_changes = st.session_state.get("folder_changes")
 
     st.markdown("---")
 
@@ -1654,7 +1020,26 @@ if st.session_state.analyzed and st.session_state.results:
         </div>
         """, unsafe_allow_html=True)
 
-    st.caption(f"Total uploaded: {total_files} | Unique analyzed: {len(results)} | Duplicates skipped: {duplicates}")
+    st.caption(f"Total uploaded: {total_files} | Unique analyzed: {len(results)} | Duplicates skipped: {duplicates} | Near-duplicates skipped: {near_duplicates}")
+    if resumed:
+        st.caption(f"Reused {resumed} finished result(s) from an earlier run of this analysis")
+    if folder_changes:
+        st.caption(
+            f"Since the last run on this folder: {folder_changes['added']} new, {folder_changes['changed']} changed, "
+            f"{folder_changes['unchanged']} unchanged, {folder_changes['removed']} removed"
+        )
+    if llm_cache_stats and llm_cache_stats["lookups"]:
+        st.caption(f"LLM cache: {llm_cache_stats['hits']}/{llm_cache_stats['lookups']} responses reused ({llm_cache_stats['hit_rate']}% hit rate)")
+    if llm_limiter_stats and llm_limiter_stats["calls"]:
+        st.caption(f"LLM calls: {llm_limiter_stats['calls']} | Retries: {llm_limiter_stats['retries']} | Rate-limited (429): {llm_limiter_stats['rate_limited']} | Peak concurrency: {llm_limiter_stats['peak_concurrency']}")
+    if llm_limiter_stats and (llm_limiter_stats["timeouts"] or llm_limiter_stats["hedged"] or llm_limiter_stats["deadline_misses"]):
+        st.caption(f"Timed-out calls: {llm_limiter_stats['timeouts']} | Hedged slow calls: {llm_limiter_stats['hedged']} | Summaries cut by the time budget: {llm_limiter_stats['deadline_misses']}")
+    if llm_summarized is not None:
+        st.caption(f"LLM summaries for the top {llm_summarized} of {len(results)} candidates - the rest use the ML summary")
+    if summary_batch_stats and summary_batch_stats["batched_requests"]:
+        st.caption(f"Batched summaries: {summary_batch_stats['batched_resumes']} resumes in {summary_batch_stats['batched_requests']} requests | Sent on their own: {summary_batch_stats['single_requests']}")
+
+    watch_summary_prefetch()
 
     st.markdown("---")
 
@@ -1756,6 +1141,16 @@ if st.session_state.analyzed and st.session_state.results:
                     if summary:
                         st.markdown(f"**📝 Summary:** {summary}")
 
+                    # On-demand LLM summary - written once, then kept on the result
+                    resume_key = candidate.get("resume_key")
+                    if candidate.get("summary_source") == "template" and resume_key in st.session_state.resume_texts:
+                        if st.button("✍️ Summarize", key=f"summarize_{resume_key}"):
+                            with st.spinner("Writing summary..."):
+                                summarized = get_summary_worker().summarize(candidate, st.session_state.resume_texts[resume_key])
+                            if summarized is not None:
+                                candidate.update(summarized)
+                            st.rerun()
+
                     # TF-IDF Similarity
                     tfidf = candidate.get("tfidf_similarity", 0)
                     if tfidf:
@@ -0,0 +1,160 @@
+"""
+Benchmark dedupe_by_name against comparing every name with every earlier one
+Generates realistic candidate names (common first names and surnames, weighted
+by how common they are, with repeat applicants under typos, initials and
+swapped order), checks the blocked version finds the same duplicates as the
+all-pairs loop, then times it on a large backlog.
+Run: py benchmark_dedupe.py [--names 20000] [--check 5000] [--seed 0]
+"""
+
+import argparse
+import itertools
+import random
+import string
+import time
+
+from rapidfuzz import fuzz
+
+from analysis import NAME_DUPLICATE_THRESHOLD, dedupe_by_name
+
+FIRST_NAMES = """
+james mary john patricia robert jennifer michael linda william elizabeth david barbara richard susan joseph
+jessica thomas sarah charles karen christopher lisa daniel nancy matthew betty anthony margaret mark sandra
+donald ashley steven kimberly paul emily andrew donna joshua michelle kenneth carol kevin amanda brian dorothy
+george melissa timothy deborah ronald stephanie edward rebecca jason sharon jeffrey laura ryan cynthia jacob
+kathleen gary amy nicholas angela eric shirley jonathan anna stephen brenda larry pamela justin emma scott
+nicole brandon helen benjamin samantha samuel katherine gregory christine alexander debra frank rachel patrick
+carolyn raymond janet jack catherine dennis maria jerry heather tyler diane aaron ruth jose julie adam olivia
+rahul priya amit neha arjun ananya vikram pooja rohan divya sanjay kavya suresh deepa aditya meera karthik
+sneha ravi lakshmi wei li jing yan hao xin ming lei jun mei hiroshi yuki kenji aiko carlos sofia luis camila
+juan valentina diego isabella miguel lucia mohammed fatima ahmed aisha omar layla ali zainab olumide chinwe
+""".split()
+
+SURNAMES = """
+smith johnson williams brown jones garcia miller davis rodriguez martinez hernandez lopez gonzalez wilson
+anderson thomas taylor moore jackson martin lee perez thompson white harris sanchez clark ramirez lewis
+robinson walker young allen king wright scott torres nguyen hill flores green adams nelson baker hall rivera
+campbell mitchell carter roberts gomez phillips evans turner diaz parker cruz edwards collins reyes stewart
+morris morales murphy cook rogers gutierrez ortiz morgan cooper peterson bailey reed kelly howard ramos kim
+cox ward richardson watson brooks chavez wood james bennett gray mendoza ruiz hughes price alvarez castillo
+sanders patel myers long ross foster jimenez kumar singh sharma gupta shah mehta iyer nair reddy rao joshi
+verma menon pillai das bose chatterjee banerjee mukherjee agarwal malhotra kapoor wang zhang liu chen yang
+huang zhao wu zhou xu sun ma zhu hu guo tanaka suzuki watanabe ito yamamoto khan hussain ahmed ali rahman
+okafor adeyemi okonkwo mensah kowalski nowak novak muller schmidt schneider fischer weber rossi russo bianchi
+""".split()
+
+
+def name_weights(names):
+    """Zipf-like weights in list order: common names come up several times as often as rare ones"""
+    return list(itertools.accumulate(1 / (rank + 10) for rank in range(len(names))))
+
+
+FIRST_NAME_WEIGHTS = name_weights(FIRST_NAMES)
+SURNAME_WEIGHTS = name_weights(SURNAMES)
+
+
+def typo(word, rng):
+    """One insertion, deletion, substitution or transposition"""
+    i = rng.randrange(len(word))
+    letter = rng.choice(string.ascii_lowercase)
+    edit = rng.choice("idst")
+    if edit == "i":
+        return word[:i] + letter + word[i:]
+    if edit == "d" and len(word) > 3:
+        return word[:i] + word[i + 1:]
+    if edit == "t" and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + letter + word[i + 1:]
+
+
+def variant(first, last, rng):
+    """The same person's name as it might appear on another application"""
+    roll = rng.random()
+    if roll < 0.3:
+        return f"{typo(first, rng)} {last}"
+    if roll < 0.55:
+        return f"{first} {typo(last, rng)}"
+    if roll < 0.7:
+        return f"{last} {first}"
+    if roll < 0.85:
+        return f"{first} {rng.choice(string.ascii_lowercase)} {last}"
+    return f"{first} {last}"
+
+
+def applicant_names(count, seed):
+    """count results with realistic names; about one applicant in ten applies more than once.
+
+    Each result's "applicant" says which person it really is.
+    """
+    rng = random.Random(seed)
+    results = []
+    while len(results) < count:
+        first = rng.choices(FIRST_NAMES, cum_weights=FIRST_NAME_WEIGHTS)[0]
+        last = rng.choices(SURNAMES, cum_weights=SURNAME_WEIGHTS)[0]
+        applicant = len(results)
+        results.append({"candidate_name": f"{first} {last}".title(), "applicant": applicant})
+        if rng.random() < 0.1:
+            results.extend(
+                {"candidate_name": variant(first, last, rng).title(), "applicant": applicant}
+                for _ in range(rng.randint(1, 2))
+            )
+    rng.shuffle(results)
+    return results[:count]
+
+
+def repeat_recall(results, unique):
+    """Share of the true repeat applications (same applicant as an earlier result) that were dropped"""
+    seen = set()
+    repeats = set()
+    for res in results:
+        if res["applicant"] in seen:
+            repeats.add(id(res))
+        seen.add(res["applicant"])
+    dropped = {id(res) for res in results} - {id(res) for res in unique}
+    return len(repeats & dropped) / len(repeats) * 100 if repeats else 100.0
+
+
+def dedupe_all_pairs(results, threshold=NAME_DUPLICATE_THRESHOLD):
+    """Reference: every name against every kept name before it"""
+    kept_names, unique, duplicates = [], [], 0
+    for res in results:
+        name_key = res.get('candidate_name', '').strip().lower()
+        if not name_key or name_key == 'unknown':
+            unique.append(res)
+        elif any(fuzz.token_sort_ratio(name_key, kept) >= threshold for kept in kept_names):
+            duplicates += 1
+        else:
+            kept_names.append(name_key)
+            unique.append(res)
+    return unique, duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--names", type=int, default=20000, help="Backlog size to time")
+    parser.add_argument("--check", type=int, default=5000, help="Backlog size to compare with the all-pairs loop")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = applicant_names(args.check, args.seed)
+    start = time.perf_counter()
+    expected, expected_duplicates = dedupe_all_pairs(results)
+    reference_time = time.perf_counter() - start
+    start = time.perf_counter()
+    actual, actual_duplicates = dedupe_by_name(results)
+    blocked_time = time.perf_counter() - start
+    print(f"Names: {args.check} | all pairs: {expected_duplicates} duplicates in {reference_time:.2f}s | "
+          f"blocked: {actual_duplicates} in {blocked_time:.2f}s")
+    print(f"Blocked finds {actual_duplicates / expected_duplicates * 100 if expected_duplicates else 100:.2f}% "
+          f"of the all-pairs duplicates | repeat applicants dropped: all pairs "
+          f"{repeat_recall(results, expected):.2f}%, blocked {repeat_recall(results, actual):.2f}%")
+
+    results = applicant_names(args.names, args.seed)
+    start = time.perf_counter()
+    unique, duplicates = dedupe_by_name(results)
+    print(f"Names: {args.names} | blocked: {duplicates} duplicates in {time.perf_counter() - start:.2f}s | "
+          f"repeat applicants dropped: {repeat_recall(results, unique):.2f}%")
+
+
+if __name__ == "__main__":
+    main()
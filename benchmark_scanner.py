@@ -0,0 +1,77 @@
+"""
+Benchmark scanner.scan_resume against the per-field extract_* functions
+Checks both give identical results on every resume, then compares speed.
+Run: py benchmark_scanner.py <resume folder> [--repeat N]
+"""
+
+import argparse
+import time
+
+from analysis import (
+    extract_contact_info,
+    extract_education,
+    extract_experience_years,
+    extract_required_experience,
+)
+from extraction import iter_extracted_texts
+from folder_scan import find_resume_files
+from scanner import scan_required_experience, scan_resume
+
+
+def reference_scan(text):
+    email, phone, location = extract_contact_info(text)
+    education_level, education_score = extract_education(text)
+    return {
+        "email": email,
+        "phone": phone,
+        "location": location,
+        "experience_years": extract_experience_years(text),
+        "education_level": education_level,
+        "education_score": education_score,
+    }
+
+
+def timed(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder", help="Folder of PDF/DOCX resumes")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing passes over the corpus")
+    args = parser.parse_args()
+
+    files = find_resume_files(args.folder, recursive=True)
+    extracted = [
+        (path, text)
+        for path, text in zip(files, iter_extracted_texts([(f.path, f.name) for f in files]))
+        if not text.startswith("Error")
+    ]
+    texts = [text for _, text in extracted]
+    if not texts:
+        print("No readable resumes found")
+        return
+
+    mismatches = 0
+    for path, text in extracted:
+        expected, actual = reference_scan(text), scan_resume(text)
+        if expected != actual or extract_required_experience(text) != scan_required_experience(text):
+            mismatches += 1
+            print(f"MISMATCH {path.name}: {expected} != {actual}")
+
+    reference_time = timed(reference_scan, texts, args.repeat)
+    scanner_time = timed(scan_resume, texts, args.repeat)
+    per_resume = 1e6 / (len(texts) * args.repeat)
+
+    print(f"Resumes: {len(texts)} | Mismatches: {mismatches}")
+    print(f"extract_* functions: {reference_time * per_resume:.1f} µs/resume")
+    print(f"scan_resume:         {scanner_time * per_resume:.1f} µs/resume")
+    print(f"Speed-up:            {reference_time / scanner_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
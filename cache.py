@@ -0,0 +1,140 @@
+"""
+Persistent on-disk caches backed by SQLite.
+
+Entries are evicted least-recently-used once the stored values exceed a size
+budget, and optionally expire after a time-to-live. Each cache carries a
+version string; opening it with a different version wipes the old entries,
+so format or parser changes never serve stale data.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+# Where caches live; override with HIRESMART_CACHE_DIR in .env
+CACHE_DIR = os.getenv("HIRESMART_CACHE_DIR", ".cache")
+
+# Bump when the table layout changes - older cache files are rebuilt
+_SCHEMA_VERSION = 2
+
+
+class DiskCache:
+    """String key/value store with size-bounded LRU eviction and optional TTL (seconds)"""
+
+    def __init__(self, name, version, max_bytes, cache_dir=None, ttl=None):
+        cache_dir = cache_dir or CACHE_DIR
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, f"{name}.sqlite3")
+        self.version = f"{_SCHEMA_VERSION}:{version}"
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                self._conn.execute("DROP TABLE IF EXISTS entries")
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.version,))
+
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key):
+        """Return the cached value or None"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """Look up several keys in one query; returns {key: value} for the hits only"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            now = time.time()
+            expired = []
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value, created FROM entries WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, value, created in rows:
+                    if self.ttl is not None and now - created > self.ttl:
+                        expired.append((key,))
+                    else:
+                        found[key] = value
+            if expired:
+                with self._conn:
+                    self._conn.executemany("DELETE FROM entries WHERE key = ?", expired)
+                self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if found:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE entries SET last_access = ? WHERE key = ?",
+                        [(now, key) for key in found]
+                    )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if over budget"""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            with self._conn:
+                old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                now = time.time()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, now)
+                )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop expired entries, then oldest ones until the cache is back under 90% of its budget"""
+        target = self.max_bytes * 0.9
+        with self._conn:
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+            # Re-sync first - another process may have written to the same file
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+            evicted = []
+            for key, size in rows:
+                if self._total_bytes <= target:
+                    break
+                evicted.append((key,))
+                self._total_bytes -= size
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def clear(self):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM entries")
+            self._total_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            "size_bytes": self._total_bytes,
+        }
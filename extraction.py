@@ -0,0 +1,300 @@
+"""
+Resume text extraction for PDF and DOCX files.
+
+This module does not import Streamlit, so the functions here can be pickled
+and run inside worker processes.
+"""
+
+import io
+import os
+import re
+import hashlib
+import sqlite3
+import itertools
+import multiprocessing
+from collections import deque
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import threading
+import zipfile
+
+import PyPDF2
+import docx
+from docx import Document
+
+from cache import DiskCache
+from folder_scan import RESUME_EXTENSIONS
+
+# Shared process pool, created on first use and reused across Streamlit reruns
+_process_pool = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+# Below this many files, process start-up costs more than it saves
+PARALLEL_EXTRACTION_MIN_FILES = 8
+
+# Bump when parsing or text cleaning changes so cached texts are re-extracted
+EXTRACTION_VERSION = 1
+EXTRACTION_CACHE_MAX_MB = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+
+# Jobs looked up in the cache at a time, and the most extraction processes
+EXTRACTION_CHUNK_SIZE = 64
+
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+
+def _clean_text(text):
+    """Collapse whitespace the same way for every parser"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _read_pdf(stream):
+    pdf_reader = PyPDF2.PdfReader(stream)
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() or ""
+    return _clean_text(text)
+
+
+def _read_docx(stream):
+    doc = Document(stream)
+    text = ""
+    for para in doc.paragraphs:
+        text += para.text + " "
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                text += cell.text + " "
+    return _clean_text(text)
+
+
+def extract_text_from_pdf(pdf_file):
+    """Extract text from uploaded PDF file"""
+    try:
+        return _read_pdf(io.BytesIO(pdf_file.read()))
+    except Exception as e:
+        return f"Error extracting text: {str(e)}"
+
+
+def extract_text_from_pdf_path(pdf_path):
+    """Extract text from PDF file path (for folder upload)"""
+    try:
+        with open(pdf_path, 'rb') as f:
+            return _read_pdf(f)
+    except Exception as e:
+        return f"Error extracting text: {str(e)}"
+
+
+def extract_text_from_docx(docx_file):
+    """Extract text from uploaded DOCX file"""
+    try:
+        return _read_docx(io.BytesIO(docx_file.read()))
+    except Exception as e:
+        return f"Error extracting text: {str(e)}"
+
+
+def extract_text_from_docx_path(docx_path):
+    """Extract text from DOCX file path (for folder upload)"""
+    try:
+        return _read_docx(docx_path)
+    except Exception as e:
+        return f"Error extracting text: {str(e)}"
+
+
+def extract_text(source, file_name):
+    """Extract text from a file path or raw file bytes, choosing the parser by extension"""
+    file_ext = Path(file_name).suffix.lower()
+    is_bytes = isinstance(source, (bytes, bytearray))
+
+    if file_ext == '.pdf':
+        if is_bytes:
+            return extract_text_from_pdf(io.BytesIO(source))
+        return extract_text_from_pdf_path(source)
+    elif file_ext in ['.docx', '.doc']:
+        if is_bytes:
+            return extract_text_from_docx(io.BytesIO(source))
+        return extract_text_from_docx_path(source)
+    return "Error: Unsupported file format"
+
+
+def iter_zip_resumes(zip_path):
+    """Yield (bytes, file_name) extraction jobs for the resumes inside a zip archive.
+
+    Members are read one at a time, so only the files being extracted are in memory.
+    """
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            name = Path(info.filename).name
+            # Skip folders and macOS resource forks (__MACOSX/._name)
+            if info.is_dir() or name.startswith("._") or Path(name).suffix.lower() not in RESUME_EXTENSIONS:
+                continue
+            yield archive.read(info), name
+
+
+def _extract_job(job):
+    """Process pool entry point - job is a (source, file_name) tuple"""
+    source, file_name = job
+    return extract_text(source, file_name)
+
+
+def _get_process_pool(max_workers):
+    """Return the shared process pool, recreating it if the size changed"""
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != max_workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            # spawn: forking the multi-threaded Streamlit server is not safe
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _process_pool_workers = max_workers
+        return _process_pool
+
+
+def _reset_process_pool():
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+        _process_pool_workers = 0
+
+
+def default_extraction_workers():
+    """One extraction process per CPU core"""
+    return max(1, os.cpu_count() or 1)
+
+
+def get_extraction_cache():
+    """Shared cache of cleaned resume text keyed by file content, or None if unavailable"""
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            # Parser library versions are part of the key - an upgrade can change the text
+            version = f"{EXTRACTION_VERSION}:{PyPDF2.__version__}:{getattr(docx, '__version__', '')}"
+            try:
+                _extraction_cache = DiskCache("extraction", version, EXTRACTION_CACHE_MAX_MB * 1024 * 1024)
+            except (sqlite3.Error, OSError):
+                return None
+        return _extraction_cache
+
+
+def file_content_hash(source):
+    """SHA-256 of the raw file bytes, from a path or bytes"""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_key(job):
+    source, file_name = job
+    try:
+        # Same bytes under a different extension go through a different parser
+        return f"{file_content_hash(source)}{Path(file_name).suffix.lower()}"
+    except OSError:
+        return None
+
+
+def _iter_cache_lookups(jobs, cache):
+    """(job, cache key, cached text or None) for jobs, looked up EXTRACTION_CHUNK_SIZE at a time"""
+    jobs = iter(jobs)
+    while True:
+        chunk = list(itertools.islice(jobs, EXTRACTION_CHUNK_SIZE))
+        if not chunk:
+            return
+        keys = [_cache_key(job) if cache and job[0] is not None else None for job in chunk]
+        cached = cache.get_many([key for key in keys if key]) if cache else {}
+        for job, key in zip(chunk, keys):
+            yield job, key, cached.get(key)
+
+
+def iter_extracted(jobs, max_workers=None, use_cache=True):
+    """Extract text for (source, file_name) jobs across a process pool.
+
+    Yields (job, text) pairs lazily in input order, so callers can update
+    progress while later files are still being parsed. jobs may be a one-shot
+    generator: it is read only a bounded window ahead of what has been
+    yielded, so only that many sources and texts are held however long it
+    is. Files whose bytes were seen before are served from the on-disk cache
+    without parsing; the cache is looked up EXTRACTION_CHUNK_SIZE jobs at a
+    time while earlier files are still parsing. Until enough files need
+    parsing to be worth the process pool, they are parsed inline. A job with
+    source None is passed through with text None, keeping its place in order.
+    """
+    cache = get_extraction_cache() if use_cache else None
+    if max_workers is None:
+        max_workers = default_extraction_workers()
+    # Not capped by the number of jobs: the pool is shared across runs, and
+    # changing its size would restart it. Workers are only spawned as jobs need them.
+    max_workers = min(max_workers, EXTRACTION_CHUNK_SIZE)
+    # Parses kept in flight: enough to keep every core busy, but a slow consumer
+    # pauses parsing instead of piling up finished texts
+    window = max_workers * 4
+
+    lookups = _iter_cache_lookups(jobs, cache)
+    queue = deque()  # [job, cache key, text, future] in input order
+    unparsed = deque()  # queued entries not yet handed to the pool, in input order
+    pool = None
+    in_flight = 0
+    try:
+        while True:
+            while in_flight + len(unparsed) < window and len(queue) < window + EXTRACTION_CHUNK_SIZE:
+                lookup = next(lookups, None)
+                if lookup is None:
+                    break
+                job, key, text = lookup
+                entry = [job, key, text, None]
+                queue.append(entry)
+                if text is None and job[0] is not None:
+                    unparsed.append(entry)
+            if pool is None and max_workers > 1 and len(unparsed) >= PARALLEL_EXTRACTION_MIN_FILES:
+                pool = _get_process_pool(max_workers)
+            if pool is not None:
+                while unparsed:
+                    entry = unparsed.popleft()
+                    entry[3] = pool.submit(_extract_job, entry[0])
+                    in_flight += 1
+
+            if not queue:
+                return
+            job, key, text, future = queue.popleft()
+            if text is None and job[0] is not None:
+                if future is None:
+                    unparsed.popleft()
+                    text = _extract_job(job)
+                else:
+                    in_flight -= 1
+                    try:
+                        text = future.result()
+                    except BrokenProcessPool:
+                        # A worker died (e.g. out of memory) - finish the rest in-process
+                        _reset_process_pool()
+                        pool = None
+                        max_workers = 1
+                        in_flight = 0
+                        unparsed = deque(entry for entry in queue if entry[3] is not None)
+                        for entry in unparsed:
+                            entry[3] = None
+                        text = _extract_job(job)
+                # Failures are not cached so a fixed file or parser gets another try
+                if key and not text.startswith("Error"):
+                    cache.set(key, text)
+            yield job, text
+    finally:
+        for entry in queue:
+            if entry[3] is not None:
+                entry[3].cancel()
+
+
+def iter_extracted_texts(jobs, max_workers=None, use_cache=True):
+    """Like iter_extracted, but yields the texts only"""
+    for _, text in iter_extracted(jobs, max_workers, use_cache):
+        yield text
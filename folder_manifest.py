@@ -0,0 +1,187 @@
+"""
+Per-folder manifests for incremental re-scans.
+
+A manifest remembers every resume file seen in a folder: its path, size,
+mtime, the hash of its extracted text and its near-duplicate signature. On
+the next scan, a file whose size and mtime are unchanged is known without
+reading it, and its result comes back from the run journal. Only new and
+changed files are extracted and analyzed, and files that are gone are
+dropped from the manifest. Runs with batch relevance also keep each file's
+TF-IDF term counts here, so the batch fit needs no re-read either.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from cache import CACHE_DIR
+from journal import JOURNAL_TTL_DAYS
+
+# Bump when the table layout changes
+_MANIFEST_VERSION = 2
+
+# Writes are committed in groups of this many
+_COMMIT_EVERY = 200
+
+
+class ManifestEntry:
+    """What the manifest knows about an unchanged file"""
+
+    __slots__ = ("content_hash", "signature", "term_counts")
+
+    def __init__(self, content_hash, signature, term_counts=None):
+        self.content_hash = content_hash
+        self.signature = signature
+        self.term_counts = term_counts
+
+
+class FolderManifest:
+    """Files of one folder (and scan scope) as of the last run.
+
+    folder_scan.ResumeFile entries are looked up as a scan goes; finish()
+    then removes the files that were not seen. scope tells apart scans of the
+    same folder with different options (subfolders, include/exclude), which
+    would otherwise see each other's files as removed. With
+    track_removals=False, finish() keeps them - for runs over only part of
+    the folder, such as the new arrivals a watcher picked up.
+    """
+
+    def __init__(self, folder, scope="", cache_dir=None, ttl_days=JOURNAL_TTL_DAYS, track_removals=True):
+        cache_dir = cache_dir or CACHE_DIR
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "manifests.sqlite3")
+        self.folder = os.path.abspath(folder)
+        self.folder_id = hashlib.sha256(f"{self.folder}\n{scope}".encode("utf-8")).hexdigest()[:16]
+        # Rows seen by this scan carry its id; rows with an older one are removed files
+        self.scan_id = time.time_ns()
+        self.track_removals = track_removals
+        self.stats = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != _MANIFEST_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS files")
+                self._conn.execute("DROP TABLE IF EXISTS folders")
+                self._conn.execute(f"PRAGMA user_version = {_MANIFEST_VERSION}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS folders ("
+                "folder_id TEXT PRIMARY KEY, folder TEXT NOT NULL, scope TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "folder_id TEXT NOT NULL, relative_path TEXT NOT NULL, size INTEGER NOT NULL, mtime REAL NOT NULL, "
+                "content_hash TEXT, signature BLOB, term_counts BLOB, scan_id INTEGER NOT NULL, "
+                "PRIMARY KEY (folder_id, relative_path))"
+            )
+
+            now = time.time()
+            stale = now - ttl_days * 86400
+            self._conn.execute(
+                "DELETE FROM files WHERE folder_id IN (SELECT folder_id FROM folders WHERE updated < ?)", (stale,)
+            )
+            self._conn.execute("DELETE FROM folders WHERE updated < ?", (stale,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO folders (folder_id, folder, scope, updated) VALUES (?, ?, ?, ?)",
+                (self.folder_id, self.folder, scope, now)
+            )
+
+    def _commit_later(self):
+        self._uncommitted += 1
+        if self._uncommitted >= _COMMIT_EVERY:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def lookup(self, resume_file):
+        """ManifestEntry if the file is unchanged since the last run, else None (new or changed)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime, content_hash, signature, term_counts FROM files "
+                "WHERE folder_id = ? AND relative_path = ?",
+                (self.folder_id, resume_file.relative_path)
+            ).fetchone()
+            if row is None:
+                self.stats["added"] += 1
+                return None
+            size, mtime, content_hash, signature, term_counts = row
+            # Unreadable last time - read it again in case the parser got better
+            if size != resume_file.size or mtime != resume_file.mtime or content_hash is None:
+                self.stats["changed"] += 1
+                return None
+            self.stats["unchanged"] += 1
+            self._conn.execute(
+                "UPDATE files SET scan_id = ? WHERE folder_id = ? AND relative_path = ?",
+                (self.scan_id, self.folder_id, resume_file.relative_path)
+            )
+            self._commit_later()
+            if term_counts is not None:
+                term_counts = json.loads(zlib.decompress(term_counts))
+            return ManifestEntry(content_hash, signature, term_counts)
+
+    def record(self, resume_file, content_hash, signature=None, term_counts=None):
+        """Remember a new or changed file once it has been read (content_hash None if unreadable)"""
+        if term_counts is not None:
+            term_counts = zlib.compress(json.dumps(term_counts, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files "
+                "(folder_id, relative_path, size, mtime, content_hash, signature, term_counts, scan_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.folder_id, resume_file.relative_path, resume_file.size, resume_file.mtime,
+                 content_hash, signature, term_counts, self.scan_id)
+            )
+            self._commit_later()
+
+    def known_files(self):
+        """{relative_path: (size, mtime)} for every file in the manifest"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT relative_path, size, mtime FROM files WHERE folder_id = ?", (self.folder_id,)
+            ).fetchall()
+        return {relative_path: (size, mtime) for relative_path, size, mtime in rows}
+
+    def content_hashes(self):
+        """{relative_path: content_hash} for every file in the manifest (None if it was unreadable)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT relative_path, content_hash FROM files WHERE folder_id = ?", (self.folder_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def remove(self, relative_paths):
+        """Forget files that are gone from the folder"""
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM files WHERE folder_id = ? AND relative_path = ?",
+                    [(self.folder_id, relative_path) for relative_path in relative_paths]
+                )
+            self._uncommitted = 0
+            self.stats["removed"] += len(relative_paths)
+
+    def finish(self):
+        """Drop the files this scan did not see; returns how many were removed"""
+        with self._lock:
+            if not self.track_removals:
+                self._conn.commit()
+                self._uncommitted = 0
+                return 0
+            with self._conn:
+                cursor = self._conn.execute(
+                    "DELETE FROM files WHERE folder_id = ? AND scan_id != ?", (self.folder_id, self.scan_id)
+                )
+            self._uncommitted = 0
+            self.stats["removed"] = cursor.rowcount
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,124 @@
+"""
+Single-pass resume folder scanner built on os.scandir.
+
+One traversal finds every PDF/DOC/DOCX file whatever the case of its
+extension, instead of a glob per extension spelling. Directory entries carry
+their file type, so only matching files are stat'ed (for size and mtime),
+which keeps listings of large network shares to one round of directory reads.
+Entries are yielded as they are found, with running counts in FolderScan.stats.
+"""
+
+import fnmatch
+import os
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+# How often (in directory entries examined) the progress callback is called
+PROGRESS_EVERY = 500
+
+
+class ResumeFile:
+    """A matching file found by a scan"""
+
+    __slots__ = ("path", "name", "relative_path", "size", "mtime")
+
+    def __init__(self, path, name, relative_path, size, mtime):
+        self.path = path
+        self.name = name
+        self.relative_path = relative_path
+        self.size = size
+        self.mtime = mtime
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"ResumeFile({self.relative_path!r}, size={self.size})"
+
+
+def _matches(relative_path, name, patterns):
+    """Case-insensitive glob match of any pattern against the relative path or the bare name"""
+    relative_path, name = relative_path.lower(), name.lower()
+    return any(fnmatch.fnmatchcase(relative_path, p) or fnmatch.fnmatchcase(name, p) for p in patterns)
+
+
+class FolderScan:
+    """Iterate over the resumes in a folder in one os.scandir traversal.
+
+    include/exclude are glob patterns (e.g. "*cv*", "archive/*") matched
+    case-insensitively against each file's path relative to folder and its
+    name; an excluded folder is not descended into. max_files stops the scan
+    after that many matches. progress(stats) is called as the scan goes.
+    """
+
+    def __init__(self, folder, recursive=False, include=None, exclude=None, max_files=None,
+                 extensions=RESUME_EXTENSIONS, progress=None):
+        self.folder = os.fspath(folder)
+        self.recursive = recursive
+        self.include = [p.lower() for p in include or []]
+        self.exclude = [p.lower() for p in exclude or []]
+        self.max_files = max_files
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.progress = progress
+        self.stats = {"folders": 0, "entries": 0, "matched": 0, "excluded": 0, "errors": 0, "capped": False}
+
+    def __iter__(self):
+        pending = [(self.folder, "")]
+        while pending:
+            folder, prefix = pending.pop()
+            try:
+                entries = os.scandir(folder)
+            except OSError:
+                self.stats["errors"] += 1
+                continue
+            self.stats["folders"] += 1
+            subfolders = []
+            with entries:
+                for entry in entries:
+                    self.stats["entries"] += 1
+                    if self.progress and self.stats["entries"] % PROGRESS_EVERY == 0:
+                        self.progress(self.stats)
+                    relative_path = prefix + entry.name
+                    try:
+                        # Symlinked folders are not followed - they can loop
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                if self.exclude and _matches(relative_path, entry.name, self.exclude):
+                                    self.stats["excluded"] += 1
+                                else:
+                                    subfolders.append((entry.path, relative_path + "/"))
+                            continue
+                        if not entry.name.lower().endswith(self.extensions) or not entry.is_file():
+                            continue
+                        if self.include and not _matches(relative_path, entry.name, self.include):
+                            self.stats["excluded"] += 1
+                            continue
+                        if self.exclude and _matches(relative_path, entry.name, self.exclude):
+                            self.stats["excluded"] += 1
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        self.stats["errors"] += 1
+                        continue
+
+                    self.stats["matched"] += 1
+                    yield ResumeFile(entry.path, entry.name, relative_path, stat.st_size, stat.st_mtime)
+                    if self.max_files and self.stats["matched"] >= self.max_files:
+                        self.stats["capped"] = True
+                        break
+            if self.stats["capped"]:
+                break
+            # Depth first, in the order the folders were listed
+            pending.extend(reversed(subfolders))
+        if self.progress:
+            self.progress(self.stats)
+
+
+def iter_resume_files(folder, recursive=False, **options):
+    """Yield ResumeFile entries for the resumes in folder, as the scan finds them"""
+    return iter(FolderScan(folder, recursive, **options))
+
+
+def find_resume_files(folder, recursive=False, **options):
+    """Resumes in folder (and its subfolders if recursive), sorted by relative path"""
+    return sorted(FolderScan(folder, recursive, **options), key=lambda f: f.relative_path.lower())
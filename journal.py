@@ -0,0 +1,95 @@
+"""
+Run journal for checkpointed, resumable analysis runs.
+
+Every finished result is written as soon as it completes, keyed by run id,
+JD hash and resume content hash. The run id covers the JD, the scoring code
+version and every setting that changes a result, so re-running the same
+analysis after a crash, tab reload or redeploy picks up the finished results
+and only analyzes the rest.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from analysis import SCORING_VERSION
+from cache import CACHE_DIR
+
+# Journals of runs untouched for this long are deleted
+JOURNAL_TTL_DAYS = float(os.getenv("JOURNAL_TTL_DAYS", "7"))
+
+# Bump when the table layout or the stored result format changes
+_JOURNAL_VERSION = 1
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class RunJournal:
+    """Finished results of one analysis run (JD + settings), by resume content hash"""
+
+    def __init__(self, job_description, settings, cache_dir=None, ttl_days=JOURNAL_TTL_DAYS):
+        cache_dir = cache_dir or CACHE_DIR
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "journal.sqlite3")
+        self.jd_hash = _sha256(job_description)
+        # A result scored by older code is not replayed, however recently its run was touched
+        self.run_id = _sha256(json.dumps([SCORING_VERSION, self.jd_hash, settings], sort_keys=True))[:16]
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != _JOURNAL_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS results")
+                self._conn.execute("DROP TABLE IF EXISTS runs")
+                self._conn.execute(f"PRAGMA user_version = {_JOURNAL_VERSION}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT PRIMARY KEY, jd_hash TEXT NOT NULL, settings TEXT NOT NULL, "
+                "created REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "run_id TEXT NOT NULL, resume_hash TEXT NOT NULL, result TEXT NOT NULL, updated REAL NOT NULL, "
+                "PRIMARY KEY (run_id, resume_hash))"
+            )
+
+            now = time.time()
+            stale = now - ttl_days * 86400
+            self._conn.execute(
+                "DELETE FROM results WHERE run_id IN (SELECT run_id FROM runs WHERE updated < ?)", (stale,)
+            )
+            self._conn.execute("DELETE FROM runs WHERE updated < ?", (stale,))
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, jd_hash, settings, created, updated) VALUES (?, ?, ?, ?, ?)",
+                (self.run_id, self.jd_hash, json.dumps(settings, sort_keys=True), now, now)
+            )
+
+    def get(self, resume_hash):
+        """The result this run already finished for a resume, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM results WHERE run_id = ? AND resume_hash = ?", (self.run_id, resume_hash)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record(self, resume_hash, result):
+        """Checkpoint one finished (or further updated) result"""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (run_id, resume_hash, result, updated) VALUES (?, ?, ?, ?)",
+                    (self.run_id, resume_hash, json.dumps(result, default=str), now)
+                )
+                self._conn.execute("UPDATE runs SET updated = ? WHERE run_id = ?", (now, self.run_id))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,99 @@
+"""
+Near-duplicate resume detection with MinHash signatures and LSH banding.
+
+get_content_hash only catches byte-identical text. The same resume
+re-exported with a different footer or date still shares almost all of its
+word shingles, which MinHash estimates cheaply. LSH banding finds candidate
+pairs in roughly linear time instead of comparing every pair.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+# Mersenne prime 2^31 - 1: a * x + b stays inside uint64 for 31-bit a, b, x
+_MERSENNE_PRIME = (1 << 31) - 1
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+NEAR_DUPLICATE_THRESHOLD = 0.85
+NUM_PERMUTATIONS = 128
+SHINGLE_SIZE = 3
+
+
+def _lsh_bands(num_perm, threshold):
+    """Bands x rows splitting num_perm whose S-curve midpoint is closest to threshold"""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class NearDuplicateIndex:
+    """Streaming MinHash/LSH index: add resumes one by one, flagging near-duplicates.
+
+    A resume is a near-duplicate when its estimated Jaccard similarity (over
+    word 3-gram shingles) with an earlier resume is at least threshold.
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, num_perm=NUM_PERMUTATIONS, seed=42):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.bands, self.rows = _lsh_bands(num_perm, threshold)
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+        self._signatures = {}
+
+    def signature(self, text):
+        """MinHash signature of the text's word shingles (None if the text has no words)"""
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        if not tokens:
+            return None
+        size = min(SHINGLE_SIZE, len(tokens))
+        shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode()) & _MERSENNE_PRIME for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        # Values are below 2^31, so uint32 is lossless and halves what the index keeps per resume
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find_or_add(self, key, text):
+        """Return the key of an earlier near-duplicate of text, or add it and return None.
+
+        key must be unique per resume (e.g. its content hash): a repeated key
+        replaces the earlier resume's signature.
+        """
+        return self.find_or_add_signature(key, self.signature(text))
+
+    @staticmethod
+    def signature_from_bytes(data):
+        """Rebuild a signature stored with signature.tobytes()"""
+        return np.frombuffer(data, dtype=np.uint32)
+
+    def find_or_add_signature(self, key, signature):
+        """find_or_add for a signature computed (or stored) earlier"""
+        if signature is None:
+            return None
+
+        checked = set()
+        for band, band_key in self._band_keys(signature):
+            for other in self._buckets[band].get(band_key, ()):
+                if other in checked:
+                    continue
+                checked.add(other)
+                # Verify the LSH candidate with the full signature estimate
+                similarity = float(np.mean(self._signatures[other] == signature))
+                if similarity >= self.threshold:
+                    return other
+
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].append(key)
+        return None
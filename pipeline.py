@@ -0,0 +1,95 @@
+"""
+Streaming extraction-to-analysis pipeline.
+
+Resumes are handed to the analysis coroutines as soon as they are extracted
+and de-duplicated, instead of waiting for the whole batch to finish
+extracting. A fixed number of in-flight slots applies backpressure to the
+producer, so a slow analysis stage never buffers the entire batch in memory.
+One event loop holds many in-flight LLM requests on a single shared client,
+instead of a thread (and its stack) per concurrent request.
+"""
+
+import asyncio
+import queue
+import threading
+
+# Marks the end of a stream on a queue
+_END = object()
+
+
+def run_async_pipeline(items, analyze, concurrency, make_context=None):
+    """Run the coroutine analyze(context, item) for up to concurrency items at once.
+
+    The event loop runs on a background thread; items is consumed lazily from a
+    worker thread so a blocking producer never stalls the loop. make_context,
+    if given, is an async context manager factory (e.g. a shared AsyncGroq
+    client) entered once on the loop and passed to every analyze call.
+    Yields (item, result, error) tuples in completion order on the caller's
+    thread, where error is the exception raised by analyze (result is then
+    None). An exception raised while producing items is re-raised at the end.
+    """
+    concurrency = max(1, concurrency)
+    # Results are small dicts; the in-flight slots are what bound memory
+    done_queue = queue.Queue()
+    stop = threading.Event()
+    producer_errors = []
+
+    async def analyze_one(context, item, slots):
+        try:
+            result, error = await analyze(context, item), None
+        except Exception as e:
+            result, error = None, e
+        finally:
+            slots.release()
+        done_queue.put((item, result, error))
+
+    async def main(context):
+        slots = asyncio.Semaphore(concurrency)
+        iterator = iter(items)
+        tasks = set()
+        try:
+            while not stop.is_set():
+                # Take a slot before pulling the next item - backpressure on the producer
+                await slots.acquire()
+                item = await asyncio.to_thread(next, iterator, _END)
+                if item is _END:
+                    break
+                task = asyncio.create_task(analyze_one(context, item, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except Exception as e:
+            producer_errors.append(e)
+        if stop.is_set():
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run():
+        if make_context is None:
+            await main(None)
+        else:
+            async with make_context() as context:
+                await main(context)
+
+    def loop_thread():
+        try:
+            asyncio.run(run())
+        except Exception as e:
+            producer_errors.append(e)
+        finally:
+            done_queue.put(_END)
+
+    thread = threading.Thread(target=loop_thread, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            event = done_queue.get()
+            if event is _END:
+                break
+            yield event
+        if producer_errors:
+            raise producer_errors[0]
+    finally:
+        # Stops pulling new items and cancels in-flight ones if the caller stops early
+        stop.set()
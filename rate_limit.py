@@ -0,0 +1,437 @@
+"""
+Adaptive rate limiting for the async LLM calls.
+
+A token bucket paces requests and honours the provider's rate-limit headers
+(x-ratelimit-remaining-*/reset-*) and retry-after on 429s. An AIMD controller
+adjusts concurrency the way TCP adjusts its window: +1 slot per window of
+healthy calls, halved on throttling, errors or latency blow-ups. Failed calls
+are retried with jittered exponential backoff instead of silently falling
+back to the template summary. Calls have a timeout, slow ones are hedged
+past the p95 latency of similar-sized calls, and an optional run deadline
+bounds the whole batch.
+"""
+
+import asyncio
+import collections
+import heapq
+import itertools
+import os
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+
+from groq import APIConnectionError, APIStatusError, RateLimitError
+
+# 0 = no fixed pace, only what the rate-limit headers and 429s say
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "64"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+# Seconds before a single LLM request is abandoned (and retried)
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "30"))
+
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+# Latency more than this many times the baseline of similar-sized calls counts as congestion
+LATENCY_TOLERANCE = 2.0
+# The baseline creeps up by this fraction per call, so an old minimum is re-learned rather than kept forever
+LATENCY_BASELINE_DECAY = 0.01
+# Hedging: recent latencies kept for the p95, and how many are needed before hedging starts
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_SECONDS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+
+def parse_duration(value):
+    """Seconds from a reset header like "2m59.56s", "7.66s", "120ms" or "3" (None if unparsable)"""
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    return sum(float(n) * _DURATION_SECONDS[u] for n, u in parts)
+
+
+def retry_after_seconds(headers):
+    """Delay requested by retry-after-ms / retry-after (seconds or HTTP date), or None"""
+    if headers is None:
+        return None
+    retry_ms = headers.get("retry-after-ms")
+    if retry_ms is not None:
+        try:
+            return float(retry_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after is None:
+        return None
+    seconds = parse_duration(retry_after)
+    if seconds is not None:
+        return seconds
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def size_class(llm_tokens):
+    """Request size band (powers of two of the estimated tokens) within which latencies are compared"""
+    return max(int(llm_tokens), 1).bit_length()
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class TokenBucket:
+    """Request pacing plus the provider's own request/token budgets.
+
+    requests_per_minute of 0 disables the fixed pace. Budgets learned from
+    response headers block callers until the advertised reset time once they
+    run out, and pause_for blocks everyone (e.g. after a 429).
+    """
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, capacity=None):
+        self.rate = requests_per_minute / 60
+        self.capacity = capacity or max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._remaining_requests = None
+        self._requests_reset_at = 0.0
+        self._remaining_tokens = None
+        self._tokens_reset_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause_for(self, seconds):
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def paused(self):
+        return time.monotonic() < self._blocked_until
+
+    def _wait_time(self, now, llm_tokens):
+        wait = self._blocked_until - now
+        if self.rate > 0:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                wait = max(wait, (1 - self._tokens) / self.rate)
+        if self._remaining_requests is not None and self._remaining_requests < 1 and now < self._requests_reset_at:
+            wait = max(wait, self._requests_reset_at - now)
+        if self._remaining_tokens is not None and self._remaining_tokens < llm_tokens and now < self._tokens_reset_at:
+            wait = max(wait, self._tokens_reset_at - now)
+        return wait
+
+    async def acquire(self, llm_tokens=0):
+        """Wait for a request slot; llm_tokens is the call's estimated token use"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = self._wait_time(now, llm_tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self._spend(llm_tokens)
+
+    def try_acquire(self, llm_tokens=0):
+        """Take a request slot only if one is free right now; returns whether it did"""
+        if self._lock.locked() or self._wait_time(time.monotonic(), llm_tokens) > 0:
+            return False
+        self._spend(llm_tokens)
+        return True
+
+    def _spend(self, llm_tokens):
+        if self.rate > 0:
+            self._tokens -= 1
+        # Spend the known budgets locally until the next response refreshes them
+        if self._remaining_requests is not None:
+            self._remaining_requests -= 1
+        if self._remaining_tokens is not None:
+            self._remaining_tokens -= llm_tokens
+
+    def observe(self, headers):
+        """Refresh the request/token budgets from x-ratelimit-* response headers"""
+        now = time.monotonic()
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining is None or reset is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+            setattr(self, f"_remaining_{kind}", remaining)
+            setattr(self, f"_{kind}_reset_at", now + reset)
+
+
+class AIMDConcurrency:
+    """Concurrency limit with additive increase / multiplicative decrease.
+
+    Free slots go to the waiting caller with the highest priority (FIFO on ties).
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=LLM_MAX_CONCURRENCY, decrease=0.5):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = min(max(initial, minimum), self.maximum)
+        self.peak = self.limit
+        self.decrease = decrease
+        self._in_flight = 0
+        self._credit = 0.0
+        self._latency = None  # smoothed over all calls, paces the decreases
+        self._size_latency = {}  # size class -> (smoothed latency, baseline)
+        self._last_decrease = 0.0
+        self._waiters = []  # heap of (-priority, arrival, future)
+        self._arrivals = itertools.count()
+
+    async def acquire(self, priority=0):
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._arrivals), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just as we were cancelled - hand the slot on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def try_acquire(self):
+        """Take a free slot without queueing; returns whether one was free"""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return True
+        return False
+
+    def release(self):
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._in_flight < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
+
+    def on_success(self, latency, llm_tokens=0):
+        """Grow by one slot per window of healthy calls, shrink if latency has blown up.
+
+        Latency is judged against calls of a similar size (llm_tokens), so a
+        batched request is not mistaken for congestion next to single ones.
+        """
+        self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+        smoothed, baseline = self._size_latency.get(size_class(llm_tokens), (None, None))
+        smoothed = latency if smoothed is None else 0.8 * smoothed + 0.2 * latency
+        baseline = smoothed if baseline is None else min(smoothed, baseline * (1 + LATENCY_BASELINE_DECAY))
+        self._size_latency[size_class(llm_tokens)] = (smoothed, baseline)
+        if smoothed > baseline * LATENCY_TOLERANCE:
+            self.on_congestion()
+            return
+        self._credit += 1 / self.limit
+        if self._credit >= 1:
+            self._credit = 0.0
+            self.limit = min(self.maximum, self.limit + 1)
+            self.peak = max(self.peak, self.limit)
+            self._wake()
+
+    def on_congestion(self):
+        """Multiplicative decrease, at most once per smoothed round trip"""
+        now = time.monotonic()
+        if now - self._last_decrease < (self._latency or 0):
+            return
+        self._last_decrease = now
+        self._credit = 0.0
+        self.limit = max(self.minimum, int(self.limit * self.decrease))
+
+
+class DeadlineExceeded(TimeoutError):
+    """The run's time budget ran out before this LLM call could finish"""
+
+
+class RateLimiter:
+    """Runs LLM requests under the token bucket and AIMD limit, retrying transient failures.
+
+    Each attempt is capped at call_timeout seconds. Once HEDGE_MIN_SAMPLES
+    calls of a similar size have completed, an attempt still running after
+    their p95 latency gets one hedged duplicate, and whichever answers first
+    wins. A hedge needs a free concurrency slot and bucket token of its own.
+    With a deadline (time.monotonic() value) nothing runs past it: waiting,
+    in-flight and retried calls raise DeadlineExceeded instead, so callers
+    fall back to the deterministic summary.
+    """
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, initial_concurrency=4,
+                 max_concurrency=LLM_MAX_CONCURRENCY, max_retries=LLM_MAX_RETRIES,
+                 call_timeout=LLM_CALL_TIMEOUT, deadline=None):
+        self.bucket = TokenBucket(requests_per_minute)
+        self.concurrency = AIMDConcurrency(initial_concurrency, maximum=max_concurrency)
+        self.max_retries = max_retries
+        self.call_timeout = call_timeout
+        self.deadline = deadline
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+        self.hedged = 0
+        self.deadline_misses = 0
+        self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=HEDGE_WINDOW))  # by size class
+
+    def _time_left(self):
+        if self.deadline is None:
+            return None
+        left = self.deadline - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceeded("LLM time budget exhausted")
+        return left
+
+    async def _within_deadline(self, make_awaitable):
+        """Await make_awaitable() - only created once the deadline is known not to have passed"""
+        left = self._time_left()
+        if left is None:
+            return await make_awaitable()
+        try:
+            return await asyncio.wait_for(make_awaitable(), left)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("LLM time budget exhausted") from None
+
+    def _hedge_delay(self, llm_tokens):
+        """Observed p95 latency of similar-sized calls, or None until there are enough samples"""
+        latencies = self._latencies[size_class(llm_tokens)]
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def _acquire_hedge(self, llm_tokens):
+        """A concurrency slot and bucket token for a hedge, if both are free right now"""
+        # No hedging while throttled - it would only add load
+        if self.bucket.paused() or not self.concurrency.try_acquire():
+            return False
+        if not self.bucket.try_acquire(llm_tokens):
+            self.concurrency.release()
+            return False
+        return True
+
+    async def _send(self, send, timeout, llm_tokens):
+        """One attempt, hedged with a duplicate request if it outlives the p95 latency"""
+        hedge_after = self._hedge_delay(llm_tokens)
+        first = asyncio.ensure_future(send())
+        if hedge_after is None or hedge_after >= timeout:
+            return await asyncio.wait_for(first, timeout)
+
+        tasks = {first}
+        hedging = False
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            # A hedge must start now to help, so it never queues for its slot
+            if not done and self._acquire_hedge(llm_tokens):
+                hedging = True
+                self.hedged += 1
+                tasks.add(asyncio.ensure_future(send()))
+            end = time.monotonic() + timeout - hedge_after
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, timeout=max(0, end - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            if hedging:
+                self.concurrency.release()
+
+    async def call(self, send, llm_tokens=0, priority=0):
+        """Await send() - a coroutine factory returning a raw response with .headers.
+
+        Higher priority calls get the next free slot first. Retries 429s (after
+        retry-after), timeouts, connection errors and 5xx with jittered
+        exponential backoff; other errors are raised at once.
+        """
+        try:
+            return await self._call(send, llm_tokens, priority)
+        except DeadlineExceeded:
+            # Counted once per request, wherever the budget ran out
+            self.deadline_misses += 1
+            raise
+
+    async def _call(self, send, llm_tokens, priority):
+        for attempt in range(self.max_retries + 1):
+            await self._within_deadline(lambda: self.concurrency.acquire(priority))
+            try:
+                await self._within_deadline(lambda: self.bucket.acquire(llm_tokens))
+                timeout = self.call_timeout
+                left = self._time_left()
+                if left is not None and left < timeout:
+                    timeout = left
+                self.calls += 1
+                start = time.monotonic()
+                try:
+                    raw = await self._send(send, timeout, llm_tokens)
+                except RateLimitError as e:
+                    self.rate_limited += 1
+                    retry_after = retry_after_seconds(e.response.headers)
+                    delay = backoff_delay(attempt) if retry_after is None else retry_after * random.uniform(1, 1.1)
+                    # The whole account is throttled, not just this request
+                    self.bucket.pause_for(delay)
+                    self.concurrency.on_congestion()
+                    error = e
+                except asyncio.TimeoutError as e:
+                    if timeout < self.call_timeout:
+                        # Cut short by the run's deadline - no point retrying
+                        raise DeadlineExceeded("LLM time budget exhausted") from e
+                    self.timeouts += 1
+                    self.concurrency.on_congestion()
+                    delay = backoff_delay(attempt)
+                    error = e
+                except (APIConnectionError, APIStatusError) as e:
+                    if isinstance(e, APIStatusError) and e.status_code < 500 and e.status_code not in (408, 409):
+                        raise
+                    self.concurrency.on_congestion()
+                    delay = backoff_delay(attempt)
+                    error = e
+                else:
+                    latency = time.monotonic() - start
+                    self._latencies[size_class(llm_tokens)].append(latency)
+                    self.concurrency.on_success(latency, llm_tokens)
+                    self.bucket.observe(raw.headers)
+                    return raw
+            finally:
+                self.concurrency.release()
+
+            if attempt == self.max_retries:
+                raise error
+            if self.deadline is not None and time.monotonic() + delay >= self.deadline:
+                raise DeadlineExceeded("LLM time budget exhausted") from error
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "timeouts": self.timeouts,
+            "hedged": self.hedged,
+            "deadline_misses": self.deadline_misses,
+            "concurrency": self.concurrency.limit,
+            "peak_concurrency": self.concurrency.peak,
+        }
@@ -0,0 +1,99 @@
+"""
+Batch TF-IDF relevance without holding the batch in memory.
+
+Each resume's term counts go to a temporary SQLite table as it is analyzed,
+while document and corpus frequencies are tallied in memory - one entry per
+distinct term, however many resumes there are. Scoring streams the counts
+back and gives the same similarities as
+analysis.batch_tfidf_similarities_from_counts.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from analysis import TFIDF_MAX_FEATURES, resume_term_counts
+
+# Inserts are committed in groups of this many
+_COMMIT_EVERY = 200
+
+
+class RelevanceIndex:
+    """Term counts of a batch of resumes, each under a caller-chosen key.
+
+    Lives in a temporary file that is deleted on close.
+    """
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(prefix="hiresmart-terms-", suffix=".sqlite3")
+        os.close(fd)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("CREATE TABLE terms (id INTEGER PRIMARY KEY, key, term_counts BLOB NOT NULL)")
+        self._doc_freq = Counter()
+        self._term_freq = Counter()
+        self._uncommitted = 0
+        self.count = 0
+
+    def add(self, key, term_counts):
+        """Keep one resume's resume_term_counts for scoring"""
+        self._doc_freq.update(term_counts.keys())
+        self._term_freq.update(term_counts)
+        self._conn.execute(
+            "INSERT INTO terms (key, term_counts) VALUES (?, ?)",
+            (key, zlib.compress(json.dumps(term_counts, separators=(",", ":")).encode("utf-8")))
+        )
+        self.count += 1
+        self._uncommitted += 1
+        if self._uncommitted >= _COMMIT_EVERY:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def similarities(self, jd_text):
+        """Yield (key, 0-100 similarity) for every resume added, in the order added.
+
+        The fit is over all resumes plus the JD, with the vectorizer's settings:
+        the TFIDF_MAX_FEATURES most frequent terms, smoothed IDF, L2-normalized rows.
+        """
+        self._conn.commit()
+        jd_counts = resume_term_counts(jd_text)
+        doc_freq = self._doc_freq + Counter(jd_counts.keys())
+        term_freq = self._term_freq + Counter(jd_counts)
+        documents = self.count + 1
+
+        # Sorted like the vectorizer's vocabulary, so ties in frequency pick the same features
+        vocabulary = sorted(term_freq)
+        if len(vocabulary) > TFIDF_MAX_FEATURES:
+            totals = np.array([term_freq[term] for term in vocabulary], dtype=np.int64)
+            vocabulary = [vocabulary[i] for i in (-totals).argsort()[:TFIDF_MAX_FEATURES]]
+        idf = {term: math.log((1 + documents) / (1 + doc_freq[term])) + 1 for term in vocabulary}
+        del doc_freq, term_freq, vocabulary
+
+        jd_vector = {term: count * idf[term] for term, count in jd_counts.items() if term in idf}
+        jd_norm = math.sqrt(sum(weight * weight for weight in jd_vector.values()))
+        for key, term_counts in self._conn.execute("SELECT key, term_counts FROM terms ORDER BY id"):
+            dot = 0.0
+            norm = 0.0
+            for term, count in json.loads(zlib.decompress(term_counts)).items():
+                weight = idf.get(term)
+                if weight is None:
+                    continue
+                weight *= count
+                norm += weight * weight
+                dot += weight * jd_vector.get(term, 0.0)
+            similarity = dot / (math.sqrt(norm) * jd_norm) if norm and jd_norm else 0.0
+            yield key, round(similarity * 100, 2)
+
+    def close(self):
+        self._conn.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
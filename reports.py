@@ -0,0 +1,94 @@
+"""
+Downloadable reports for a finished analysis.
+
+Shared by the Streamlit app and the command-line screener, so it does not
+import Streamlit.
+"""
+
+import pandas as pd
+from fpdf import FPDF
+
+
+def create_excel_report(results, categories, total_files, duplicates, job_title):
+    """Create Excel report with all candidate data"""
+    data = []
+    for result in results:
+        data.append({
+            "Candidate Name": result.get('candidate_name', 'Unknown'),
+            "Fit Score": result.get('fit_score', 0),
+            "Verdict": result.get('verdict', 'N/A'),
+            "Job Title Applied": job_title,
+            "Current Role": result.get('current_role', 'N/A'),
+            "Experience (Years)": result.get('experience_years', 0),
+            "Location": result.get('location', 'Not provided'),
+            "Email": result.get('email', 'Not provided'),
+            "Phone": result.get('phone', 'Not provided'),
+            "Skills Matched": ", ".join(result.get('skills_matched', [])),
+            "Skills Missing": ", ".join(result.get('skills_missing', [])),
+            "Nice-to-Have Skills": ", ".join(result.get('nice_to_have_matched', [])),
+            "Strengths": ", ".join(result.get('strengths', [])),
+            "Weaknesses": ", ".join(result.get('weaknesses', [])),
+            "Summary": result.get('summary', 'N/A'),
+            "Recommendation": result.get('recommendation', 'N/A')
+        })
+
+    df = pd.DataFrame(data)
+    return df
+
+
+def generate_pdf_report(results, job_title, categories, total_files, duplicates):
+    """Generate PDF Report for Resume Analysis"""
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    # Title
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(200, 10, "AI Resume Shortlisting Report", ln=True, align="C")
+    pdf.ln(10)
+
+    # Job Title
+    pdf.set_font("Arial", "", 12)
+    pdf.cell(200, 10, f"Job Title: {job_title}", ln=True)
+    pdf.ln(5)
+
+    # Summary Section
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(200, 10, "Processing Summary", ln=True)
+
+    pdf.set_font("Arial", "", 11)
+    pdf.cell(200, 8, f"Total Files Uploaded: {total_files}", ln=True)
+    pdf.cell(200, 8, f"Unique Resumes Analyzed: {len(results)}", ln=True)
+    pdf.cell(200, 8, f"Duplicates Skipped: {duplicates}", ln=True)
+    pdf.ln(8)
+
+    # Category Breakdown
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(200, 10, "Results Breakdown", ln=True)
+
+    pdf.set_font("Arial", "", 11)
+    for cat, cat_results in categories.items():
+        pdf.cell(200, 8, f"{cat}: {len(cat_results)} candidates", ln=True)
+
+    pdf.ln(10)
+
+    # Top Candidates
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(200, 10, "Top Candidates", ln=True)
+
+    pdf.set_font("Arial", "", 10)
+    for result in results[:10]:
+        pdf.multi_cell(
+            0,
+            7,
+            f"Name: {result.get('candidate_name')}\n"
+            f"Score: {result.get('fit_score')}%\n"
+            f"Role: {result.get('current_role')}\n"
+            f"Location: {result.get('location')}\n"
+            f"Recommendation: {result.get('recommendation')}\n"
+            "----------------------------------------"
+        )
+
+    # ✅ Return PDF bytes
+    return pdf.output(dest="S").encode("latin-1")
@@ -0,0 +1,127 @@
+"""
+On-disk result store for runs too large to rank in memory.
+
+Results are appended as they complete and read back best first; a result
+for a resume already in the store (same content hash) replaces it. The ranking
+is an ORDER BY on an indexed score column, so SQLite sorts on disk (spilling
+to temporary files when it has to) instead of holding every result in a list.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+# Appends are committed in groups of this many
+_COMMIT_EVERY = 200
+
+
+class ResultStore:
+    """Store of result dicts, one per resume, ranked by fit_score on read.
+
+    With no path, the store lives in a temporary file that is deleted on close.
+    """
+
+    def __init__(self, path=None):
+        self._temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="hiresmart-results-", suffix=".sqlite3")
+            os.close(fd)
+        self.path = path
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "id INTEGER PRIMARY KEY, resume_hash TEXT, candidate_name TEXT NOT NULL, "
+                "fit_score REAL NOT NULL, result TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_rank ON results (fit_score DESC, id)")
+            self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS results_resume ON results (resume_hash)")
+
+    def add(self, result, resume_hash=None):
+        """Append one result, replacing an earlier one for the same resume; returns its row id"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR REPLACE INTO results (resume_hash, candidate_name, fit_score, result) VALUES (?, ?, ?, ?)",
+                (resume_hash, result.get("candidate_name", ""), result.get("fit_score", 0), json.dumps(result, default=str))
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= _COMMIT_EVERY:
+                self._commit()
+            return cursor.lastrowid
+
+    def update(self, resume_hash, result):
+        """Replace the stored result for a resume (e.g. after its LLM summary is in)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE results SET candidate_name = ?, fit_score = ?, result = ? WHERE resume_hash = ?",
+                (result.get("candidate_name", ""), result.get("fit_score", 0), json.dumps(result, default=str), resume_hash)
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= _COMMIT_EVERY:
+                self._commit()
+
+    def get(self, resume_hash):
+        """The stored result for a resume, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM results WHERE resume_hash = ?", (resume_hash,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def discard(self, resume_hash):
+        """Remove the result stored for a resume, if any"""
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE resume_hash = ?", (resume_hash,))
+            # Rare, and other readers of the store should stop seeing the result now
+            self._commit()
+
+    def _commit(self):
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def rank_of(self, fit_score):
+        """1-based rank a result with this score has among the stored ones"""
+        with self._lock:
+            return 1 + self._conn.execute(
+                "SELECT COUNT(*) FROM results WHERE fit_score > ?", (fit_score,)
+            ).fetchone()[0]
+
+    def ranked_names(self):
+        """(row id, candidate name) best first - enough to de-duplicate by name"""
+        with self._lock:
+            self._commit()
+            return self._conn.execute(
+                "SELECT id, candidate_name FROM results ORDER BY fit_score DESC, id"
+            ).fetchall()
+
+    def ranked(self, limit=None):
+        """Yield (row id, result) best first, ties in the order they were added"""
+        with self._lock:
+            self._commit()
+        # A separate cursor streams rows without loading the whole table
+        cursor = self._conn.execute(
+            "SELECT id, result FROM results ORDER BY fit_score DESC, id LIMIT ?",
+            (-1 if limit is None else limit,)
+        )
+        for row_id, result in cursor:
+            yield row_id, json.loads(result)
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
+        if self._temporary:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except OSError:
+                    pass
@@ -0,0 +1,160 @@
+"""
+Regex scanner for resume contact details, experience and education.
+
+All patterns are compiled once at import. Cities and degree keywords are each
+one alternation regex, matched as whole words ("Pune" not in "Punekar", "MS
+in" not in "teams in"). Phone numbers come from one pass that finds runs of
+digits and separators; the phone formats then only run on those few short
+runs. The priority order of each list still decides which match wins.
+scan_resume lowercases the text a single time and returns everything the ML
+scoring needs in one call.
+"""
+
+import re
+
+## ===================== PATTERNS ===================== ##
+
+EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+
+# Phone (Indian + international formats), tried in priority order
+PHONE_PATTERNS = [
+    r'(?:\+91[\s-]?)?[6-9]\d{4}[\s-]?\d{5}',  # Indian mobile
+    r'(?:\+91[\s-]?)?\d{5}[\s-]?\d{5}',          # 10 digit
+    r'(?:\+\d{1,3}[\s-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}',  # US/intl
+    r'\d{3}[\s-]\d{3}[\s-]\d{4}',                 # XXX-XXX-XXXX
+]
+
+# Location - common Indian cities + international, first listed wins
+CITIES = [
+    "Mumbai", "Delhi", "Bangalore", "Bengaluru", "Hyderabad", "Chennai",
+    "Kolkata", "Pune", "Ahmedabad", "Jaipur", "Lucknow", "Kanpur",
+    "Nagpur", "Indore", "Thane", "Bhopal", "Visakhapatnam", "Vadodara",
+    "Gurgaon", "Gurugram", "Noida", "Chandigarh", "Coimbatore", "Kochi",
+    "Mysore", "Mysuru", "Surat", "Nashik", "Rajkot", "Ranchi",
+    "New York", "San Francisco", "London", "Dubai", "Singapore", "Toronto",
+    "Remote", "Work from home", "WFH", "Hybrid"
+]
+
+# Years of experience in a resume, tried in priority order (first group is the years)
+EXPERIENCE_PATTERNS = [
+    r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of)?\s*(?:experience|exp)',
+    r'experience\s*(?:of)?\s*(\d+)\+?\s*(?:years?|yrs?)',
+    r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:in|of)\s*(?:IT|software|development|engineering)',
+    r'total\s*(?:experience|exp)\s*(?:of)?\s*(\d+)',
+    r'(\d+)\s*(?:years?|yrs?)\s*(\d+)\s*(?:months?|mos?)',
+]
+
+# Required years in a JD, tried in priority order (first group is the lower bound)
+REQUIRED_EXPERIENCE_PATTERNS = [
+    r'(\d+)\s*[-–to]+\s*(\d+)\+?\s*(?:years?|yrs?)',  # "5-10+ years", "5-10 years"
+    r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of)?\s*(?:experience|exp)',  # "5+ years of experience"
+    r'minimum\s*(\d+)\s*(?:years?|yrs?)',  # "minimum 5 years"
+    r'(\d+)\+?\s*(?:years?|yrs?)',  # Simple fallback: "5+ years", "5 years"
+]
+
+# Degrees, highest first: (level, score, keywords)
+EDUCATION_LEVELS = [
+    ("PhD", 10, ['ph.d', 'phd', 'doctorate', 'doctoral']),
+    ("Masters", 10, ['m.tech', 'mtech', 'm.sc', 'msc', 'mba', 'm.e.', 'masters', 'master of', 'ms in', 'm.s.', 'mca', 'm.c.a']),
+    ("Bachelors", 7, ['b.tech', 'btech', 'b.sc', 'bsc', 'b.e.', 'bachelor', 'bca', 'b.c.a', 'b.eng', 'beng', 'b.com']),
+    ("Diploma", 5, ['diploma', 'polytechnic', 'certification', 'certified']),
+]
+EDUCATION_NOT_DETECTED = ("Not detected", 3)
+
+
+def _keyword_regex(keywords):
+    """One alternation matching any keyword as a whole word ("Bachelors" too).
+
+    Longest first, so a keyword never loses to a shorter one it starts with.
+    Lookarounds instead of \\b, which fails next to the dots in "m.e." or "b.sc".
+    """
+    alternatives = "|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"(?<![a-z0-9])(?:{alternatives})s?(?![a-z0-9])")
+
+
+def _best_match(regex, priorities, text):
+    """Highest-priority (lowest value) keyword regex finds in text, or None"""
+    best = None
+    for match in regex.finditer(text):
+        keyword = match.group(0)
+        priority = priorities.get(keyword)
+        if priority is None:
+            # Matched with the plural "s"
+            priority = priorities[keyword[:-1]]
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
+    return best
+
+
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+_PHONE_RES = [re.compile(p) for p in PHONE_PATTERNS]
+# Every phone format matches only these characters, starts with "+", "(" or a
+# digit and is at least 10 long, so a match always lies inside one such run.
+# A regex starting with a character class lets re skip straight to candidates.
+_PHONE_RUN_RE = re.compile(r'[+(\d][\d\s().+-]{9,}')
+_PHONE_MIN_DIGITS = 10
+_CITY_RE = _keyword_regex([city.lower() for city in CITIES])
+# keyword -> position in its list; reversed so a repeated keyword keeps its first position
+_CITY_PRIORITY = {city.lower(): i for i, city in reversed(list(enumerate(CITIES)))}
+_EDUCATION_PRIORITY = {
+    kw: i for i, (_, _, keywords) in reversed(list(enumerate(EDUCATION_LEVELS))) for kw in keywords
+}
+_EDUCATION_RE = _keyword_regex(list(_EDUCATION_PRIORITY))
+_EXPERIENCE_RES = [re.compile(p, re.IGNORECASE) for p in EXPERIENCE_PATTERNS]
+_REQUIRED_EXPERIENCE_RES = [re.compile(p, re.IGNORECASE) for p in REQUIRED_EXPERIENCE_PATTERNS]
+
+
+## ===================== SCANNING ===================== ##
+
+def _first_group(patterns, text):
+    """Integer value of group 1 from the first pattern that matches, else 0"""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return int(match.group(1))
+    return 0
+
+
+def scan_required_experience(jd_text):
+    """Required years from a JD - same result as extract_required_experience"""
+    return _first_group(_REQUIRED_EXPERIENCE_RES, jd_text)
+
+
+def scan_resume(text):
+    """Contact details, years of experience and education from one resume.
+
+    Returns a dict with email, phone, location, experience_years,
+    education_level and education_score.
+    """
+    text_lower = text.lower()
+
+    email_match = _EMAIL_RE.search(text)
+    email = email_match.group(0) if email_match else "Not provided"
+
+    phone = "Not provided"
+    runs = [run for run in _PHONE_RUN_RE.findall(text) if sum(c.isdigit() for c in run) >= _PHONE_MIN_DIGITS]
+    for pattern in _PHONE_RES:
+        # Runs are in text order, so the first hit is pattern.search(text)
+        phone_match = next(filter(None, map(pattern.search, runs)), None)
+        if phone_match:
+            phone = phone_match.group(0).strip()
+            break
+
+    city_index = _best_match(_CITY_RE, _CITY_PRIORITY, text_lower)
+    location = CITIES[city_index] if city_index is not None else "Not provided"
+
+    level_index = _best_match(_EDUCATION_RE, _EDUCATION_PRIORITY, text_lower)
+    education_level, education_score = (
+        EDUCATION_LEVELS[level_index][:2] if level_index is not None else EDUCATION_NOT_DETECTED
+    )
+
+    return {
+        "email": email,
+        "phone": phone,
+        "location": location,
+        "experience_years": _first_group(_EXPERIENCE_RES, text),
+        "education_level": education_level,
+        "education_score": education_score,
+    }
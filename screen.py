@@ -0,0 +1,176 @@
+"""
+Screen a folder or zip of resumes against a job description without the web UI.
+Writes one JSON line per candidate, ranked, for nightly bulk runs.
+Files are read lazily and results are ranked on disk, so memory stays flat.
+Run: py screen.py <resume folder or .zip> --jd job.txt [--output results.jsonl] [--excel report.xlsx]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from analysis import CASCADE_MIN_SCORE, CASCADE_TOP_K, LLM_CONCURRENCY, SUMMARY_BATCH_SIZE
+from extraction import iter_zip_resumes
+from folder_manifest import FolderManifest
+from folder_scan import FolderScan
+from near_duplicates import NEAR_DUPLICATE_THRESHOLD
+from reports import create_excel_report
+from results_store import ResultStore
+from screening import BATCH_RELEVANCE, ScreeningRun
+
+
+def extraction_jobs_for(source, scan_options):
+    """Lazy (source, file_name) jobs for a folder of resumes or a zip archive, and the folder scan"""
+    path = Path(source)
+    if path.is_file() and path.suffix.lower() == ".zip":
+        return iter_zip_resumes(path), None
+    if path.is_dir():
+        scan = FolderScan(path, **scan_options)
+        return iter(scan), scan
+    raise SystemExit(f"Not a folder or .zip file: {source}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="Folder of PDF/DOCX resumes, or a .zip of them")
+    parser.add_argument("--jd", required=True, help="Text file with the job description")
+    parser.add_argument("--job-title", default="Not specified", help="Job title shown in the results")
+    parser.add_argument("--nice-to-have", default="", help="Comma-separated nice-to-have skills")
+    parser.add_argument("--output", "-o", help="JSON Lines output file (default: stdout)")
+    parser.add_argument("--excel", help="Also write the ranked results to this .xlsx file")
+    parser.add_argument("--top", type=int, default=None, help="Only the best N candidates in the ranked output and --excel")
+    parser.add_argument("--store", help="Keep the on-disk result store at this path (default: a temporary file)")
+    parser.add_argument("--recursive", action="store_true", help="Include subfolders")
+    parser.add_argument("--include", action="append", help="Only files matching this glob (repeatable), e.g. '*cv*'")
+    parser.add_argument("--exclude", action="append", help="Skip files and folders matching this glob (repeatable)")
+    parser.add_argument("--max-files", type=int, default=None, help="Stop after this many resumes")
+    parser.add_argument("--extraction-workers", type=int, default=None, help="Extraction processes (default: one per core)")
+    parser.add_argument("--llm-workers", type=int, default=LLM_CONCURRENCY, help="Starting concurrent LLM requests")
+    parser.add_argument("--no-llm", action="store_true", help="ML scores and template summaries only - no API key needed")
+    parser.add_argument("--llm-top-k", type=int, default=None,
+                        help=f"Only summarize the top K candidates with the LLM (e.g. {CASCADE_TOP_K})")
+    parser.add_argument("--llm-min-score", type=int, default=CASCADE_MIN_SCORE, help="Minimum fit score for --llm-top-k")
+    parser.add_argument("--summary-batch-size", type=int, default=0,
+                        help=f"Resumes per LLM request (e.g. {SUMMARY_BATCH_SIZE}; default: one per request)")
+    parser.add_argument("--batch-relevance", action=argparse.BooleanOptionalAction, default=BATCH_RELEVANCE,
+                        help="Score relevance with one TF-IDF fit over the batch (on by default, like the app)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write each line as soon as the candidate is scored - before ranking and name "
+                             "de-duplication; needs --no-batch-relevance and no --llm-top-k or --top")
+    parser.add_argument("--near-duplicate-threshold", type=float, default=NEAR_DUPLICATE_THRESHOLD,
+                        help="Skip resumes overlapping an earlier one at least this much (1.0 turns it off)")
+    parser.add_argument("--time-budget", type=float, default=0, help="Minutes after which pending LLM calls give up")
+    parser.add_argument("--resume", action="store_true", help="Pick up the finished results of an interrupted run")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Folders only: remember the folder's files and only read new and changed ones next time")
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+    if not args.no_llm and (not api_key or api_key == "your_groq_api_key_here"):
+        raise SystemExit("GROQ_API_KEY is not set - add it to .env or pass --no-llm")
+
+    job_description = Path(args.jd).read_text(encoding="utf-8")
+    scan_options = {
+        "recursive": args.recursive,
+        "include": args.include,
+        "exclude": args.exclude,
+        "max_files": args.max_files,
+    }
+    extraction_jobs, scan = extraction_jobs_for(args.source, scan_options)
+    manifest = None
+    if args.incremental:
+        if scan is None or args.max_files:
+            raise SystemExit("--incremental needs a folder and a complete scan (no --max-files)")
+        manifest = FolderManifest(args.source, scope=json.dumps(scan_options, sort_keys=True))
+
+    if args.no_llm:
+        llm_mode = "off"
+    elif args.llm_top_k is not None:
+        llm_mode = "cascade"
+    else:
+        llm_mode = "full"
+
+    store = ResultStore(args.store)
+    run = ScreeningRun(
+        extraction_jobs,
+        job_description,
+        job_title=args.job_title,
+        nice_to_have_skills=[s.strip() for s in args.nice_to_have.split(",") if s.strip()],
+        api_key=api_key,
+        llm_mode=llm_mode,
+        batch_relevance=args.batch_relevance,
+        near_duplicate_threshold=args.near_duplicate_threshold,
+        summary_batch_size=args.summary_batch_size,
+        cascade_top_k=args.llm_top_k if args.llm_top_k is not None else CASCADE_TOP_K,
+        cascade_min_score=args.llm_min_score,
+        time_budget=args.time_budget,
+        resume=args.resume,
+        extraction_workers=args.extraction_workers,
+        llm_concurrency=args.llm_workers,
+        result_store=store,
+        manifest=manifest
+    )
+
+    # Batch relevance and the cascade change results after the first pass, and
+    # --top and name de-duplication need the whole batch, so only a plain run streams
+    if args.stream and (args.batch_relevance or llm_mode == "cascade" or args.top is not None):
+        raise SystemExit("--stream needs --no-batch-relevance and cannot be combined with --llm-top-k or --top")
+    stream_lines = args.stream
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        for result in run.analyze():
+            if stream_lines:
+                out.write(json.dumps(result, default=str) + "\n")
+                out.flush()
+            found = f"found {scan.stats['matched']} · " if scan else ""
+            print(f"\r{found}{run.files_done} files done", end="", file=sys.stderr, flush=True)
+        if run.files_done == 0:
+            raise SystemExit("No PDF/DOCX files found")
+        run.score_relevance()
+        for done_count, shortlist_size in run.summarize_top():
+            print(f"\rSummarizing top candidates {done_count}/{shortlist_size}", end="", file=sys.stderr, flush=True)
+        run.finish()
+        if not stream_lines:
+            for result in run.ranked(args.top):
+                out.write(json.dumps(result, default=str) + "\n")
+        if args.excel:
+            report = create_excel_report(run.ranked(args.top), None, run.files_done, run.stats["duplicates"], args.job_title)
+            report.to_excel(args.excel, index=False)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        store.close()
+
+    print(
+        f"\n{run.result_count - run.stats['name_duplicates']} candidates from {run.files_done} files "
+        f"in {time.perf_counter() - start:.1f}s | "
+        f"duplicates: {run.stats['duplicates']} | near-duplicates: {run.stats['near_duplicates']} | "
+        f"same name: {run.stats['name_duplicates']} | resumed: {run.stats['resumed']}",
+        file=sys.stderr
+    )
+    if manifest:
+        changes = manifest.stats
+        print(
+            f"Since the last run: {changes['added']} new, {changes['changed']} changed, "
+            f"{changes['unchanged']} unchanged, {changes['removed']} removed",
+            file=sys.stderr
+        )
+    if scan:
+        stats = scan.stats
+        print(
+            f"Scanned {stats['entries']} entries in {stats['folders']} folders | matched: {stats['matched']} | "
+            f"excluded: {stats['excluded']} | unreadable: {stats['errors']}"
+            + (f" | stopped at --max-files {args.max_files}" if stats["capped"] else ""),
+            file=sys.stderr
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""
+Headless screening runs: the whole resume pipeline without Streamlit.
+
+ScreeningRun takes the same inputs and settings as the Analyze button -
+extraction, de-duplication, ML scoring, LLM summaries, checkpointing - and
+exposes each stage as a step the caller drives. app.py drives it to update
+its progress bar and live leaderboard; screen.py drives it from the command
+line for unattended bulk screening.
+
+Memory stays flat however many resumes a run has: files are read lazily,
+at most SCREENING_WINDOW resumes are held between extraction and their
+result, and with a ResultStore every result goes to disk as it completes
+and the final ranking is sorted there.
+"""
+
+import asyncio
+import collections
+import heapq
+import os
+import sqlite3
+import time
+
+from groq import AsyncGroq
+
+from analysis import (
+    CASCADE_MIN_SCORE,
+    CASCADE_TOP_K,
+    JDProfile,
+    LLM_CONCURRENCY,
+    SummaryBatcher,
+    analyze_resume_async,
+    apply_relevance,
+    clean_candidate_name,
+    dedupe_by_name,
+    extract_name_from_resume,
+    get_content_hash,
+    get_llm_cache,
+    resume_term_counts,
+    score_resume,
+    select_for_summary,
+    summarize_resume_async,
+)
+from extraction import iter_extracted
+from folder_scan import ResumeFile
+from journal import RunJournal
+from near_duplicates import NEAR_DUPLICATE_THRESHOLD, NearDuplicateIndex
+from pipeline import run_async_pipeline
+from rate_limit import LLM_MAX_CONCURRENCY, RateLimiter
+from relevance_index import RelevanceIndex
+
+# full: LLM summary for every resume; cascade: only for the top-ranked ones;
+# lazy: ML scores only, summaries written later on demand; off: no LLM calls
+LLM_MODES = ("full", "cascade", "lazy", "off")
+
+# One TF-IDF fit over the whole batch for relevance - the default in the app and screen.py alike
+BATCH_RELEVANCE = True
+
+# Resumes analyzed (and their texts held) at once. The limiter hands out LLM
+# slots by ML score among these, so this is also the priority window.
+SCREENING_WINDOW = int(os.getenv("SCREENING_WINDOW", "1000"))
+
+
+def error_result(candidate_name, job_title, error, summary):
+    """Placeholder result for a resume that could not be read or analyzed"""
+    return {
+        "candidate_name": candidate_name,
+        "job_title": job_title,
+        "fit_score": 0,
+        "error": error,
+        "verdict": "Error",
+        "current_role": "Unknown",
+        "location": "Not provided",
+        "skills_matched": [],
+        "skills_missing": [],
+        "nice_to_have_matched": [],
+        "summary": summary
+    }
+
+
+class ScreeningRun:
+    """One analysis of a batch of resumes against one job description.
+
+    extraction_jobs are (source, file_name) tuples, where source is a path or
+    the raw file bytes, or folder_scan.ResumeFile entries; it may be a
+    generator, read as the run goes. With a FolderManifest, unchanged
+    ResumeFile entries take their result from the run journal without being
+    read, unless a later step needs their text (cascade and on-demand
+    summaries do; batch relevance uses term counts kept in the manifest). Call
+    analyze() and iterate it, then score_relevance(), then iterate
+    summarize_top(), then finish() for the ranked results.
+
+    Results are kept in the results list, or appended to result_store (a
+    ResultStore) if one is given. Batch relevance keeps each resume's term
+    counts in a RelevanceIndex on disk. Lazy summaries and batch-ranked
+    cascades need every resume text until the end, so they are not
+    constant-memory.
+    """
+
+    def __init__(self, extraction_jobs, job_description, job_title="Not specified",
+                 nice_to_have_skills=(), api_key=None, llm_mode="full", batch_relevance=BATCH_RELEVANCE,
+                 near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD, summary_batch_size=0,
+                 cascade_top_k=CASCADE_TOP_K, cascade_min_score=CASCADE_MIN_SCORE,
+                 time_budget=0, resume=False, extraction_workers=None, llm_concurrency=LLM_CONCURRENCY,
+                 result_store=None, total=None, manifest=None):
+        if llm_mode not in LLM_MODES:
+            raise ValueError(f"llm_mode must be one of {LLM_MODES}, got {llm_mode!r}")
+        self.extraction_jobs = extraction_jobs
+        self.job_description = job_description
+        self.job_title = job_title
+        self.api_key = api_key
+        self.llm_mode = llm_mode
+        self.batch_relevance = batch_relevance
+        self.resume = resume
+        self.cascade_top_k = cascade_top_k
+        self.cascade_min_score = cascade_min_score
+        self.extraction_workers = extraction_workers
+        # Scoring runs ahead of the LLM, which comes after ranking or never
+        self.score_first = llm_mode != "full"
+
+        # Number of files, if known up front (None for a generator)
+        self.total = len(extraction_jobs) if hasattr(extraction_jobs, "__len__") else total
+        self.result_store = result_store
+        self.manifest = manifest
+        self.results = []
+        self.result_count = 0
+        self.analyzed = []  # (result, resume_text) for lazy summaries and batch-ranked cascades
+        self._relevance = None  # RelevanceIndex of term counts, keyed by content hash or results position
+        self._shortlist = []  # heap of the best cascade candidates so far, with their texts
+        self._shortlist_seq = 0
+        self._dropped_rows = set()
+        self.stats = {"extracted": 0, "duplicates": 0, "near_duplicates": 0, "resumed": 0, "name_duplicates": 0}
+        self.llm_summarized = None
+
+        # Starting in-flight LLM requests on one async client
+        self.llm_concurrency = max(1, min(llm_concurrency, self.total or llm_concurrency))
+        self.window = max(1, min(SCREENING_WINDOW, self.total or SCREENING_WINDOW))
+        deadline = time.monotonic() + time_budget * 60 if time_budget > 0 else None
+        # Paces calls to the account's rate limits and grows/shrinks concurrency (AIMD)
+        self.limiter = RateLimiter(initial_concurrency=self.llm_concurrency, deadline=deadline)
+        self.batcher = SummaryBatcher(job_title, summary_batch_size, limiter=self.limiter) if summary_batch_size > 1 else None
+
+        # Parse the JD once for the whole batch
+        self.jd_profile = JDProfile(job_description, list(nice_to_have_skills))
+        self.near_duplicate_index = NearDuplicateIndex(near_duplicate_threshold) if near_duplicate_threshold < 1.0 else None
+        self._seen_hashes = {}
+
+        self.llm_cache = get_llm_cache()
+        self._llm_cache_before = self.llm_cache.stats() if self.llm_cache else None
+
+        # Checkpoint journal: results finished by an earlier, interrupted run of the same analysis
+        self.journal = None
+        # Incremental folder runs take unchanged files' results from the journal
+        if resume or manifest is not None:
+            try:
+                self.journal = RunJournal(job_description, {
+                    "job_title": job_title,
+                    "nice_to_have_skills": sorted(nice_to_have_skills),
+                    "batch_relevance": batch_relevance,
+                    "score_first": self.score_first,
+                })
+            except sqlite3.Error:
+                self.journal = None
+
+    @property
+    def files_done(self):
+        """Files analyzed, failed or skipped as duplicates so far"""
+        return self.result_count + self.stats["duplicates"] + self.stats["near_duplicates"]
+
+    def _make_client(self):
+        # Retries are handled by the limiter, not the SDK
+        return AsyncGroq(api_key=self.api_key, max_retries=0)
+
+    def _is_duplicate(self, file_name, content_hash, signature):
+        """Count and skip exact and near-duplicates of earlier resumes, or remember this one"""
+        if content_hash in self._seen_hashes:
+            self.stats["duplicates"] += 1
+            return True
+        # Keyed by content hash - display names repeat across folders and uploads
+        if self.near_duplicate_index and self.near_duplicate_index.find_or_add_signature(content_hash, signature) is not None:
+            # Same resume re-exported with small changes - skip the LLM call
+            self.stats["near_duplicates"] += 1
+            return True
+        self._seen_hashes[content_hash] = file_name
+        return False
+
+    def _replay(self, resume_file):
+        """Data for an unchanged file from the manifest and journal, or None if it has to be read"""
+        entry = self.manifest.lookup(resume_file)
+        if entry is None or not self.journal:
+            return None
+        # These steps need the resume text, which is only had by reading the file
+        if self.llm_mode in ("cascade", "lazy"):
+            return None
+        if self.batch_relevance and entry.term_counts is None:
+            return None
+        if self.near_duplicate_index and entry.signature is None:
+            return None
+        result = self.journal.get(entry.content_hash)
+        if result is None:
+            return None
+        signature = NearDuplicateIndex.signature_from_bytes(entry.signature) if self.near_duplicate_index else None
+        return {"resume_text": None, "candidate_name": result.get("candidate_name"), "content_hash": entry.content_hash,
+                "signature": signature, "term_counts": entry.term_counts, "result": result}
+
+    def _iter_resumes(self):
+        """Extract, name and de-duplicate resumes - runs on a pipeline worker thread"""
+        replays = collections.deque()  # (job, replayed data or None), in file order
+
+        def sources():
+            for job in self.extraction_jobs:
+                data = self._replay(job) if self.manifest is not None and isinstance(job, ResumeFile) else None
+                replays.append((job, data))
+                if data is not None:
+                    # Nothing to read, but it keeps its place in the extraction order
+                    yield None, job.name
+                elif isinstance(job, ResumeFile):
+                    yield job.path, job.name
+                else:
+                    yield job
+
+        # Replays stay in file order, so duplicates and score ties resolve as in a run that reads everything
+        for (_, file_name), resume_text in iter_extracted(sources(), max_workers=self.extraction_workers):
+            job, data = replays.popleft()
+            if data is None:
+                data = self._prepare_extracted(job, file_name, resume_text)
+            elif self._is_duplicate(job.name, data["content_hash"], data.pop("signature")):
+                data = None
+            else:
+                self.stats["resumed"] += 1
+            if data is not None:
+                yield data
+
+    def _prepare_extracted(self, job, file_name, resume_text):
+        """Name and de-duplicate a file that was read; None for a duplicate"""
+        self.stats["extracted"] += 1
+
+        # Clean the filename (remove platform prefixes, extensions, etc.)
+        clean_name = clean_candidate_name(file_name)
+
+        if resume_text.startswith("Error"):
+            data = {
+                "candidate_name": clean_name,
+                "resume_text": None,
+                "result": error_result(clean_name, self.job_title, resume_text, "Could not extract text from file")
+            }
+            if isinstance(job, ResumeFile):
+                # No text to hash - keyed by path so a later, readable copy can replace it
+                data["store_key"] = f"file:{job.relative_path}"
+                if self.manifest is not None:
+                    self.manifest.record(job, None)
+            return data
+
+        # Try to extract actual name from resume content
+        extracted_name = extract_name_from_resume(resume_text)
+        if extracted_name:
+            clean_name = extracted_name
+
+        content_hash = get_content_hash(resume_text)
+        signature = self.near_duplicate_index.signature(resume_text) if self.near_duplicate_index else None
+        term_counts = resume_term_counts(resume_text) if self.batch_relevance else None
+        if self.manifest is not None and isinstance(job, ResumeFile):
+            self.manifest.record(
+                job, content_hash, signature.tobytes() if signature is not None else None, term_counts
+            )
+
+        if self._is_duplicate(file_name, content_hash, signature):
+            return None
+        data = {"resume_text": resume_text, "candidate_name": clean_name, "content_hash": content_hash,
+                "term_counts": term_counts}
+        # The journal is also open for incremental runs - only resume from it when asked to
+        journaled = self.journal.get(content_hash) if self.journal and self.resume else None
+        if journaled is not None:
+            # Finished before the last run was interrupted - no need to redo it
+            self.stats["resumed"] += 1
+            data["result"] = journaled
+        return data
+
+    async def _analyze_one(self, client, data):
+        """Analyze a single resume - many run concurrently on one event loop"""
+        if "result" in data:
+            return data["result"]
+        # Batch mode fills relevance in once the whole batch is known
+        tfidf_sim = 0 if self.batch_relevance else None
+        if self.score_first:
+            # ML score only - summaries come after the whole batch is ranked, or on demand
+            return await asyncio.to_thread(
+                score_resume, data['resume_text'], data['candidate_name'], self.job_title, self.jd_profile, tfidf_sim
+            )
+        return await analyze_resume_async(
+            client,
+            data['resume_text'],
+            data['candidate_name'],
+            self.job_title,
+            self.jd_profile,
+            tfidf_sim=tfidf_sim,
+            limiter=self.limiter,
+            batcher=self.batcher
+        )
+
+    def analyze(self):
+        """Extract and analyze every resume, yielding each result as it completes.
+
+        Extraction feeds analysis as files become ready. A whole window of
+        resumes can be scored and queued at once - the limiter is the real gate
+        and hands out LLM slots by descending ML score.
+        """
+        stream = run_async_pipeline(
+            self._iter_resumes(),
+            self._analyze_one,
+            self.window,
+            make_context=None if self.score_first else self._make_client
+        )
+        for data, result, error in stream:
+            resume_text = data['resume_text'] if error is None else None
+            if error is not None:
+                result = error_result(data['candidate_name'], self.job_title, str(error), f"Error: {str(error)}")
+            self.result_count += 1
+            if self.result_store is not None:
+                self.result_store.add(result, data.get('content_hash') or data.get('store_key'))
+            else:
+                self.results.append(result)
+            if error is None and self.batch_relevance and data.get("term_counts") is not None:
+                if self._relevance is None:
+                    self._relevance = RelevanceIndex()
+                key = data["content_hash"] if self.result_store is not None else len(self.results) - 1
+                self._relevance.add(key, data["term_counts"])
+            if resume_text is not None:
+                self._keep_text(result, resume_text)
+                # A failed LLM call is not checkpointed, so a resumed run retries it
+                if self.journal and "result" not in data and (self.score_first or result.get("summary_source") == "llm"):
+                    self.journal.record(data['content_hash'], result)
+            yield result
+
+    def _keep_text(self, result, resume_text):
+        """Hold on to the texts later steps need - all of them, or only the cascade's top K"""
+        # A batch-ranked cascade picks its shortlist once relevance is in, so from every resume
+        if self.llm_mode == "lazy" or (self.batch_relevance and self.llm_mode == "cascade"):
+            self.analyzed.append((result, resume_text))
+        elif self.llm_mode == "cascade":
+            score = result.get("fit_score", 0)
+            if score < self.cascade_min_score:
+                return
+            # Ties keep the earlier result, like a stable sort would
+            self._shortlist_seq += 1
+            entry = (score, -self._shortlist_seq, result, resume_text)
+            if not self.cascade_top_k or len(self._shortlist) < self.cascade_top_k:
+                heapq.heappush(self._shortlist, entry)
+            else:
+                heapq.heappushpop(self._shortlist, entry)
+
+    def score_relevance(self):
+        """One TF-IDF fit over the whole batch + JD for relevance scores (batch mode only)"""
+        if self._relevance is None:
+            return
+        # Results a later step holds in memory are updated in place, the rest in the store
+        held = {get_content_hash(text): result for result, text in self.analyzed} if self.result_store is not None else {}
+        for key, similarity in self._relevance.similarities(self.job_description):
+            if self.result_store is None:
+                apply_relevance(self.results[key], similarity)
+                continue
+            result = held.get(key) or self.result_store.get(key)
+            if result is not None:
+                apply_relevance(result, similarity)
+                self.result_store.update(key, result)
+        self._relevance.close()
+        self._relevance = None
+
+    def summarize_top(self):
+        """Cascade mode: LLM summaries for the top-ranked candidates only.
+
+        Yields (done, total) as each summary is written.
+        """
+        if self.llm_mode != "cascade":
+            return
+        # Relevance scores change the ranking, so batch mode picks from every resume
+        candidates = self.analyzed or [(r, t) for _, _, r, t in sorted(self._shortlist, key=lambda e: -e[1])]
+        self._shortlist = []
+        if not candidates:
+            return
+        shortlist = [candidates[i] for i in select_for_summary(
+            [r for r, _ in candidates], self.cascade_top_k, self.cascade_min_score
+        )]
+        self.llm_summarized = len(shortlist)
+        # Summaries checkpointed by an interrupted run are kept
+        shortlist = [entry for entry in shortlist if entry[0].get("summary_source") != "llm"]
+
+        async def summarize_one(client, entry):
+            result, resume_text = entry
+            return await summarize_resume_async(client, result, resume_text, limiter=self.limiter, batcher=self.batcher)
+
+        summary_stream = run_async_pipeline(
+            shortlist,
+            summarize_one,
+            min(LLM_MAX_CONCURRENCY, max(1, len(shortlist))),
+            make_context=self._make_client
+        )
+        for done_count, (entry, _, error) in enumerate(summary_stream, 1):
+            if error is None and (self.journal or self.result_store is not None):
+                content_hash = get_content_hash(entry[1])
+                if self.journal:
+                    self.journal.record(content_hash, entry[0])
+                if self.result_store is not None:
+                    self.result_store.update(content_hash, entry[0])
+            yield done_count, len(shortlist)
+
+    def finish(self):
+        """Rank the results, drop repeated candidates and close the journal.
+
+        Returns the ranked list, or with a result store an iterator over it.
+        """
+        self.analyzed = []
+        self._shortlist = []
+        if self._relevance is not None:
+            self._relevance.close()
+            self._relevance = None
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if self.manifest is not None:
+            self.manifest.finish()
+            self.manifest.close()
+
+        if self.result_store is not None:
+            # Only the names are read back to find repeats; results stay on disk
+            names = [{"candidate_name": name, "row": row} for row, name in self.result_store.ranked_names()]
+            unique, self.stats["name_duplicates"] = dedupe_by_name(names)
+            kept = {entry["row"] for entry in unique}
+            self._dropped_rows = {entry["row"] for entry in names if entry["row"] not in kept}
+            return self.ranked()
+
+        self.results.sort(key=lambda x: x.get('fit_score', 0), reverse=True)
+
+        # Name-based deduplication: if same candidate name appears multiple times,
+        # keep only the one with the highest score (fuzzy matching within name blocks)
+        self.results, self.stats["name_duplicates"] = dedupe_by_name(self.results)
+        return self.results
+
+    def ranked(self, limit=None):
+        """Yield the final results best first, at most limit of them"""
+        if self.result_store is None:
+            yield from self.results[:limit]
+            return
+        count = 0
+        for row, result in self.result_store.ranked():
+            if row in self._dropped_rows:
+                continue
+            if limit is not None and count >= limit:
+                return
+            count += 1
+            yield result
+
+    def run(self):
+        """All steps in order; returns the ranked results (see finish)"""
+        for _ in self.analyze():
+            pass
+        self.score_relevance()
+        for _ in self.summarize_top():
+            pass
+        return self.finish()
+
+    def llm_cache_stats(self):
+        """Hit rate for this run only - the cache counters are process-wide"""
+        if not self.llm_cache:
+            return None
+        after = self.llm_cache.stats()
+        hits = after["hits"] - self._llm_cache_before["hits"]
+        lookups = hits + after["misses"] - self._llm_cache_before["misses"]
+        return {
+            "hits": hits,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups * 100, 1) if lookups else 0.0,
+        }
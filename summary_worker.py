@@ -0,0 +1,73 @@
+"""
+Background LLM summaries for results that were ranked with ML scores only.
+
+A SummaryWorker runs one event loop on a daemon thread with one AsyncGroq
+client and one RateLimiter, so prefetched and on-demand summaries share the
+account's rate limits, retries and backoff. The worker never touches the
+caller's result dicts: it summarizes copies and hands them back through a
+queue (prefetch) or a return value (on demand), for the caller to apply on
+its own thread.
+"""
+
+import asyncio
+import queue
+import threading
+
+from groq import AsyncGroq
+
+from analysis import summarize_resume_async
+from rate_limit import RateLimiter
+
+# Above any fit score, so a summary someone is waiting for goes before prefetches
+ON_DEMAND_PRIORITY = 1000
+
+
+class SummaryWorker:
+    """Writes LLM summaries on a background event loop"""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.limiter = RateLimiter()
+        self._client = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    async def _summarize(self, result, resume_text, priority=None):
+        """A summarized copy of result, or None if the LLM summary failed"""
+        if self._client is None:
+            # Retries are handled by the limiter, not the SDK
+            self._client = AsyncGroq(api_key=self.api_key, max_retries=0)
+        summarized = dict(result)
+        await summarize_resume_async(self._client, summarized, resume_text, limiter=self.limiter, priority=priority)
+        return summarized if summarized.get("summary_source") == "llm" else None
+
+    def prefetch(self, entries, time_budget=0):
+        """Summarize (key, result, resume_text) entries, best fit score first.
+
+        Returns (future, completed): each summarized copy is put on the
+        completed queue as (key, result), and the concurrent.futures.Future is
+        done once all are. Summaries still pending after time_budget minutes
+        (0 = no limit) are dropped.
+        """
+        completed = queue.Queue()
+
+        async def summarize_one(key, result, resume_text):
+            summarized = await self._summarize(result, resume_text)
+            if summarized is not None:
+                completed.put((key, summarized))
+
+        async def run():
+            batch = asyncio.gather(*(summarize_one(*entry) for entry in entries))
+            try:
+                await asyncio.wait_for(batch, time_budget * 60 if time_budget > 0 else None)
+            except asyncio.TimeoutError:
+                pass
+
+        return asyncio.run_coroutine_threadsafe(run(), self._loop), completed
+
+    def summarize(self, result, resume_text):
+        """Summarized copy of result ahead of any prefetch, or None on failure - blocks until done"""
+        return asyncio.run_coroutine_threadsafe(
+            self._summarize(result, resume_text, ON_DEMAND_PRIORITY), self._loop
+        ).result()
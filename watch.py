@@ -0,0 +1,196 @@
+"""
+Watch a folder for new resumes and score each arrival against one or more job descriptions.
+Polls the folder (no OS-specific file events), waits until files stop changing, and appends results to a store per JD.
+Run: py watch.py <resume folder> --jd backend.txt [--jd frontend.txt] [--store-dir results] [--interval 2]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from folder_manifest import FolderManifest
+from folder_scan import FolderScan
+from near_duplicates import NEAR_DUPLICATE_THRESHOLD
+from results_store import ResultStore
+from screening import ScreeningRun
+
+POLL_INTERVAL = 2.0  # seconds between folder scans
+SETTLE_SECONDS = 2.0  # a file must be this old, with the same size as the last poll, to be read
+
+
+class WatchedJob:
+    """One configured job description and the store its results go to"""
+
+    def __init__(self, jd_path, store_dir):
+        jd_path = Path(jd_path)
+        self.job_description = jd_path.read_text(encoding="utf-8")
+        # backend_engineer.txt -> "Backend Engineer"
+        self.job_title = re.sub(r"[_\-]+", " ", jd_path.stem).strip().title() or "Not specified"
+        self.store = ResultStore(os.path.join(store_dir, f"{jd_path.stem}.sqlite3"))
+
+
+class FolderWatcher:
+    """Polls a folder and analyzes every new or changed resume once it is fully written.
+
+    A file is ready once its mtime is at least settle_seconds old and its size
+    matches the previous poll, so files still being copied are left alone.
+    A writer that pauses for longer than that can still be read early; the
+    file is then read again once it changes, and its new result replaces the
+    old one. When a file's content changes or the file is deleted, its old
+    result leaves every job's store. Processed files are kept in a
+    FolderManifest, so a restarted watcher only picks up what arrived while
+    it was down.
+    """
+
+    def __init__(self, folder, jobs, recursive=False, include=None, exclude=None,
+                 settle_seconds=SETTLE_SECONDS, **run_options):
+        self.folder = folder
+        self.jobs = jobs
+        self.scan_options = {"recursive": recursive, "include": include, "exclude": exclude}
+        self.scope = json.dumps(self.scan_options, sort_keys=True)
+        self.settle_seconds = settle_seconds
+        self.run_options = run_options
+
+        # Runs get a manifest of their own (finish() closes it); this one tracks the folder between runs
+        self.manifest = FolderManifest(folder, scope=self.scope, track_removals=False)
+        self.known = self.manifest.known_files()  # relative path -> (size, mtime) already processed
+        self.content_hashes = self.manifest.content_hashes()  # relative path -> hash its result is stored under
+        self.pending = {}  # relative path -> (size, mtime) at the last poll, not yet ready
+
+    def poll(self):
+        """Scan once; returns the ResumeFile entries ready to be analyzed"""
+        now = time.time()
+        seen = set()
+        ready = []
+        for resume_file in FolderScan(self.folder, **self.scan_options):
+            seen.add(resume_file.relative_path)
+            state = (resume_file.size, resume_file.mtime)
+            if self.known.get(resume_file.relative_path) == state:
+                continue
+            settled = resume_file.size > 0 and now - resume_file.mtime >= self.settle_seconds
+            if settled and self.pending.get(resume_file.relative_path) == state:
+                ready.append(resume_file)
+            else:
+                self.pending[resume_file.relative_path] = state
+
+        removed = [path for path in self.known if path not in seen]
+        if removed:
+            self.manifest.remove(removed)
+            old_hashes = {path: self.content_hashes.pop(path, None) for path in removed}
+            for path in removed:
+                del self.known[path]
+            self._discard_stale(old_hashes)
+        for path in [path for path in self.pending if path not in seen]:
+            del self.pending[path]
+        return ready
+
+    def process(self, resume_files):
+        """Analyze resume_files against every job; yields (job, result, rank, total) as results complete"""
+        for job in self.jobs:
+            # A file that could not be read last time (e.g. still being copied) is read again
+            for resume_file in resume_files:
+                job.store.discard(f"file:{resume_file.relative_path}")
+            run = ScreeningRun(
+                resume_files,
+                job.job_description,
+                job_title=job.job_title,
+                # Arrivals come in ones and twos - too few for a batch TF-IDF fit
+                batch_relevance=False,
+                result_store=job.store,
+                # Checkpointed, so a re-dropped resume or a restart reuses finished results
+                resume=True,
+                manifest=FolderManifest(self.folder, scope=self.scope, track_removals=False),
+                **self.run_options
+            )
+            for result in run.analyze():
+                yield job, result, job.store.rank_of(result.get("fit_score", 0)), len(job.store)
+            run.finish()
+        old_hashes = {f.relative_path: self.content_hashes.get(f.relative_path) for f in resume_files}
+        self.content_hashes = self.manifest.content_hashes()
+        for resume_file in resume_files:
+            self.known[resume_file.relative_path] = (resume_file.size, resume_file.mtime)
+            self.pending.pop(resume_file.relative_path, None)
+        self._discard_stale(old_hashes)
+
+    def _discard_stale(self, old_hashes):
+        """Drop results stored under old_hashes ({path: hash}) that no file in the folder has any more"""
+        in_use = set(self.content_hashes.values())
+        stale = {h for path, h in old_hashes.items() if h and self.content_hashes.get(path) != h and h not in in_use}
+        for job in self.jobs:
+            for content_hash in stale:
+                job.store.discard(content_hash)
+            for path in old_hashes:
+                if path not in self.content_hashes:
+                    # Deleted - an unreadable file's result is stored under its path
+                    job.store.discard(f"file:{path}")
+
+    def close(self):
+        self.manifest.close()
+        for job in self.jobs:
+            job.store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder", help="Folder the ATS drops resumes into")
+    parser.add_argument("--jd", action="append", required=True, help="Job description text file (repeatable)")
+    parser.add_argument("--store-dir", default="watch_results", help="Folder for the per-JD result stores")
+    parser.add_argument("--output", "-o", help="Append one JSON line per scored resume here (default: stdout)")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Seconds between folder scans")
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS,
+                        help="Seconds a file must be unchanged before it is read")
+    parser.add_argument("--recursive", action="store_true", help="Include subfolders")
+    parser.add_argument("--include", action="append", help="Only files matching this glob (repeatable)")
+    parser.add_argument("--exclude", action="append", help="Skip files and folders matching this glob (repeatable)")
+    parser.add_argument("--no-llm", action="store_true", help="ML scores and template summaries only - no API key needed")
+    parser.add_argument("--near-duplicate-threshold", type=float, default=NEAR_DUPLICATE_THRESHOLD,
+                        help="Skip resumes overlapping an earlier one in the same batch at least this much")
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+    if not args.no_llm and (not api_key or api_key == "your_groq_api_key_here"):
+        raise SystemExit("GROQ_API_KEY is not set - add it to .env or pass --no-llm")
+    if not Path(args.folder).is_dir():
+        raise SystemExit(f"Not a folder: {args.folder}")
+
+    os.makedirs(args.store_dir, exist_ok=True)
+    watcher = FolderWatcher(
+        args.folder,
+        [WatchedJob(jd_path, args.store_dir) for jd_path in args.jd],
+        recursive=args.recursive,
+        include=args.include,
+        exclude=args.exclude,
+        settle_seconds=args.settle,
+        api_key=api_key,
+        llm_mode="off" if args.no_llm else "full",
+        near_duplicate_threshold=args.near_duplicate_threshold
+    )
+    out = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    print(f"Watching {args.folder} for {len(watcher.jobs)} job(s) - Ctrl+C to stop", file=sys.stderr)
+    try:
+        while True:
+            started = time.monotonic()
+            ready = watcher.poll()
+            if ready:
+                for job, result, rank, total in watcher.process(ready):
+                    out.write(json.dumps({"jd": job.job_title, "rank": rank, "of": total, **result}, default=str) + "\n")
+                    out.flush()
+                print(f"Scored {len(ready)} new file(s) in {time.monotonic() - started:.1f}s", file=sys.stderr)
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()